@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Throughput and accuracy benchmarks for the coordinate transformation classes.
+
+Run from this folder:
+    python benchmarks.py
+"""
+
+import time
+import numpy as np
+
+from ecef_converter_class import ECEFConverter
+from quaternion_class import Quaternion
+
+
+def _time_call(func, *args, repeat=3, **kwargs):
+    """Return the best wall time (s) over `repeat` calls and the last result."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def benchmark_ecef_to_lla(n_points=1_000_000, seed=0):
+    """Compare the closed-form and iterative ECEF -> LLA solvers."""
+    rng = np.random.default_rng(seed)
+    converter = ECEFConverter(0.0, 0.0)
+    
+    # Random points from below the surface up to GEO altitude
+    lat = rng.uniform(-90, 90, n_points)
+    lon = rng.uniform(-180, 180, n_points)
+    alt = rng.uniform(-1e4, 3.6e7, n_points)
+    ecef = converter._lla_to_ecef(np.deg2rad(lat), np.deg2rad(lon), alt).T
+    
+    print(f"ECEF -> LLA on {n_points:,} points")
+    for method in ("closed_form", "iterative"):
+        elapsed, (lat_out, lon_out, alt_out) = _time_call(converter.ecef_to_lla, ecef, method=method)
+        lat_err = np.abs(lat_out - lat).max()
+        lon_err = np.abs((lon_out - lon + 180) % 360 - 180).max()
+        alt_err = np.abs(alt_out - alt).max()
+        print(f"  {method:<12} {n_points / elapsed / 1e6:6.2f} Mpts/s  "
+              f"max err: lat {lat_err:.2e}deg, lon {lon_err:.2e}deg, alt {alt_err:.2e} m")
+
+
+
+def benchmark_quaternion_ops(n_ops=200_000):
+    """Compare the allocation-free Quaternion paths with the generic ones."""
+    q = Quaternion.from_axis_angle((1, 2, 3), 0.3)
+    dq = Quaternion.from_axis_angle((0, 0, 1), 1e-4)
+    v = (1.0, 2.0, 3.0)
+    
+    def rotate_generic():
+        # General inverse (conjugate / |q|^2), as before the unit-quaternion shortcut
+        for _ in range(n_ops):
+            conj = q.conjugate()
+            n2 = q.norm()**2
+            q_inv = Quaternion(conj.w/n2, conj.x/n2, conj.y/n2, conj.z/n2)
+            q_rot = q * Quaternion(0, *v) * q_inv
+            (q_rot.x, q_rot.y, q_rot.z)
+    
+    def rotate_fast():
+        for _ in range(n_ops):
+            q.rotate_vector(v)
+    
+    def propagate_new_object():
+        att = Quaternion(1, 0, 0, 0, is_unit=True)
+        for _ in range(n_ops):
+            att = att * dq
+    
+    def propagate_in_place():
+        att = Quaternion(1, 0, 0, 0, is_unit=True)
+        for _ in range(n_ops):
+            att *= dq
+    
+    print(f"Quaternion scalar ops, {n_ops:,} iterations")
+    for name, func in (("rotate q*v*q^-1", rotate_generic),
+                       ("rotate_vector", rotate_fast),
+                       ("att = att * dq", propagate_new_object),
+                       ("att *= dq", propagate_in_place)):
+        elapsed, _ = _time_call(func)
+        print(f"  {name:<16} {elapsed / n_ops * 1e9:7.1f} ns/op")
+
+
+if __name__ == "__main__":
+    benchmark_ecef_to_lla()
+    benchmark_quaternion_ops()
@@ -6,8 +6,18 @@ Created on Sat Sep 13 17:30:01 2025
 @author: kpetchsaiprasert
 """
 
+from functools import lru_cache
+
 import numpy as np
 
+from rotation_conversions import ned_to_body_dcm
+
+# Sign pattern for the NED <-> ENU component swap (third axis flips)
+_SWAP_FLIP_SIGNS = np.array([1.0, 1.0, -1.0])
+
+# Record layout returned by ECEFConverter.ecef_to_horizon_batch
+HORIZON_DTYPE = np.dtype([('az', 'f8'), ('el', 'f8'), ('range', 'f8')])
+
 class ECEFConverter:
     """
     Convert coordinates from ECEF to NED or ENU frames.
@@ -18,33 +28,51 @@ class ECEFConverter:
         alt (flaot): Reference altitude in meters (optional, used for precision)
     """
     
+    # WGS84 ellipsoid constants
+    a = 6378137.0 # semi-major axis (m)
+    f = 1 / 298.257223563 # flattening
+    e2 = f * (2 - f) # eccentricity^2
+    
     def __init__(self, lat: float, lon: float, alt: float =0):
         self.lat = np.deg2rad(lat)
         self.lon = np.deg2rad(lon)
         self.alt = alt # in meters
         
-        # WGS84 ellipsoid constants
-        self.a = 6378137.0 # semi-major axis (m)
-        self.f = 1 / 298.257223563 # flattening
-        self.e2 = self.f * (2 - self.f) # eccentricity^2
+        # Trig of the reference site, evaluated once for both matrices
+        slat, clat = np.sin(self.lat), np.cos(self.lat)
+        slon, clon = np.sin(self.lon), np.cos(self.lon)
         
         # Precompute rotation matrices
         self.R_ecef_to_enu = np.array([
-            [-np.sin(self.lon),                   np.cos(self.lon),                  0],
-            [-np.sin(self.lat)*np.cos(self.lon), -np.sin(self.lat)*np.sin(self.lon), np.cos(self.lat)],
-            [np.cos(self.lat)*np.cos(self.lon),   np.cos(self.lat)*np.sin(self.lon), np.sin(self.lat)] 
+            [-slon,       clon,      0],
+            [-slat*clon, -slat*slon, clat],
+            [clat*clon,   clat*slon, slat] 
         ])
         
         # NED is just ENU with a reorder and flip
         self.R_ecef_to_ned = np.array([
-            [-np.sin(self.lat)*np.cos(self.lon), -np.sin(self.lat)*np.sin(self.lon),  np.cos(self.lat)],
-            [-np.sin(self.lon),                   np.cos(self.lon),                   0],
-            [-np.cos(self.lat)*np.cos(self.lon), -np.cos(self.lat)*np.sin(self.lon), -np.sin(self.lat)]
+            [-slat*clon, -slat*slon,  clat],
+            [-slon,       clon,       0],
+            [-clat*clon, -clat*slon, -slat]
         ])
         
         # Precompute observer ECEF position
         self.obs_ecef = self._lla_to_ecef(self.lat, self.lon, self.alt)
         
+    def __setattr__(self, name, value):
+        if getattr(self, "_frozen", False):
+            raise AttributeError(f"Cannot set '{name}' on a frozen ECEFConverter")
+        super().__setattr__(name, value)
+    
+    def freeze(self):
+        """
+        Make the converter immutable (attributes and arrays read-only) so a
+        single instance can be shared safely across threads.
+        """
+        for arr in (self.R_ecef_to_enu, self.R_ecef_to_ned, self.obs_ecef):
+            arr.flags.writeable = False
+        self._frozen = True
+        return self
         
     def _lla_to_ecef(self, lat, lon, h):
         """ 
@@ -57,36 +85,146 @@ class ECEFConverter:
         z = (N * (1 - self.e2) + h) * np.sin(lat)
         return np.array([x, y, z])
         
-    def ecef_to_enu(self, ecef_vector):
+    def ecef_to_lla(self, ecef, method="closed_form", tol=1e-12, max_iter=10):
+        """
+        Convert ECEF positions to geodetic latitude, longitude and altitude.
+        
+        Args:
+            ecef (ndarray): A single 3-vector or an (N,3) array in meters
+            method (str): 'closed_form' (Heikkinen) or 'iterative'
+            tol (float): Latitude convergence tolerance in radians (iterative only)
+            max_iter (int): Maximum number of iterations (iterative only)
+        
+        Returns:
+            (lat, lon, alt) in degrees, degrees and meters.
+        """
+        ecef = np.asarray(ecef, dtype=float)
+        if ecef.shape[-1] != 3:
+            raise ValueError("Vectors must have a last dimension of size 3")
+        x, y, z = ecef[..., 0], ecef[..., 1], ecef[..., 2]
+        
+        if method == "closed_form":
+            lat, alt = self._geodetic_heikkinen(x, y, z)
+        elif method == "iterative":
+            lat, alt = self._geodetic_iterative(x, y, z, tol, max_iter)
+        else:
+            raise ValueError("Invalid method. Choose 'closed_form' or 'iterative'.")
+        
+        lon = np.arctan2(y, x)
+        return np.degrees(lat), np.degrees(lon), alt
+    
+    def _geodetic_heikkinen(self, x, y, z):
+        """Closed-form ECEF -> (lat [rad], alt) after Heikkinen (1982)."""
+        a, e2 = self.a, self.e2
+        b = a * (1 - self.f)
+        ep2 = (a**2 - b**2) / b**2 # second eccentricity^2
+        
+        p = np.sqrt(x**2 + y**2)
+        F = 54 * b**2 * z**2
+        G = p**2 + (1 - e2) * z**2 - e2 * (a**2 - b**2)
+        c = e2**2 * F * p**2 / G**3
+        s = np.cbrt(1 + c + np.sqrt(c**2 + 2*c))
+        k = s + 1 + 1/s
+        P = F / (3 * k**2 * G**2)
+        Q = np.sqrt(1 + 2 * e2**2 * P)
+        r0 = (-P * e2 * p / (1 + Q)
+              + np.sqrt(0.5 * a**2 * (1 + 1/Q) - P * (1 - e2) * z**2 / (Q * (1 + Q)) - 0.5 * P * p**2))
+        U = np.sqrt((p - e2 * r0)**2 + z**2)
+        V = np.sqrt((p - e2 * r0)**2 + (1 - e2) * z**2)
+        z0 = b**2 * z / (a * V)
+        
+        alt = U * (1 - b**2 / (a * V))
+        lat = np.arctan2(z + ep2 * z0, p)
+        return lat, alt
+    
+    def _geodetic_iterative(self, x, y, z, tol, max_iter):
+        """Fixed-point ECEF -> (lat [rad], alt), stops once every point has converged."""
+        a, e2 = self.a, self.e2
+        p = np.sqrt(x**2 + y**2)
+        
+        # Start from the geocentric-to-geodetic first guess
+        lat = np.arctan2(z, p * (1 - e2))
+        for _ in range(max_iter):
+            N = a / np.sqrt(1 - e2 * np.sin(lat)**2)
+            lat_new = np.arctan2(z + e2 * N * np.sin(lat), p)
+            converged = np.all(np.abs(lat_new - lat) < tol)
+            lat = lat_new
+            if converged:
+                break
+        
+        # Height formula that stays well-conditioned near the poles
+        sin_lat, cos_lat = np.sin(lat), np.cos(lat)
+        alt = p * cos_lat + z * sin_lat - a * np.sqrt(1 - e2 * sin_lat**2)
+        return lat, alt
+    
+    def ecef_to_enu(self, ecef_vector, out=None):
         """
         Convert a vector from ECEF to ENU frame.
 
+        Accepts a single 3-vector or an (N,3) array of vectors. An optional
+        `out` array of matching shape can be given to avoid allocating.
         """
-        return self.R_ecef_to_enu @ ecef_vector
+        return self._rotate(self.R_ecef_to_enu, ecef_vector, out)
     
-    def ecef_to_ned(self, ecef_vector):
+    def ecef_to_ned(self, ecef_vector, out=None):
         """
         Convert a vector from ECEF to NED frame.
+        
+        Accepts a single 3-vector or an (N,3) array of vectors.
         """
         
-        return self.R_ecef_to_ned @ ecef_vector
+        return self._rotate(self.R_ecef_to_ned, ecef_vector, out)
     
-    def ned_to_enu(self, ned_vector):
+    def ned_to_enu(self, ned_vector, out=None):
         """
         Convert to vector from NED to ENU frame.
+        
+        Accepts a single 3-vector or an (N,3) array of vectors.
         """
         
         # NED to ENU = swap N<->E, invert Down to Up
-        N, E, D = ned_vector
-        return np.array([E, N, -D])
+        return self._swap_and_flip(ned_vector, out)
     
-    def enu_to_ned(self, enu_vector):
+    def enu_to_ned(self, enu_vector, out=None):
         """
         Convert a vector from ENU to NED frame.
+        
+        Accepts a single 3-vector or an (N,3) array of vectors.
         """
         
-        E, N, U = enu_vector
-        return np.array([N, E, -U])
+        return self._swap_and_flip(enu_vector, out)
+    
+    @staticmethod
+    def _rotate(R, vectors, out=None):
+        """
+        Apply rotation matrix R to a 3-vector or to each row of an (N,3) array.
+        
+        A single vector goes through the same (N,3) @ R.T product as a batch
+        (with N = 1), so a batch gives exactly the same numbers as converting
+        its rows one at a time. R.T is made C-contiguous so every batch size
+        uses the same BLAS kernel.
+        """
+        vectors = np.asarray(vectors)
+        if vectors.shape[-1] != 3:
+            raise ValueError("Vectors must have a last dimension of size 3")
+        if out is None:
+            out = np.empty(vectors.shape, dtype=np.result_type(vectors, R))
+        
+        # matmul buffers the result if `out` aliases the input
+        flat = out.reshape(-1, 3) # a view unless `out` is non-contiguous
+        np.matmul(vectors.reshape(-1, 3), np.ascontiguousarray(R.T), out=flat)
+        if not np.shares_memory(flat, out):
+            out[...] = flat.reshape(out.shape)
+        return out
+    
+    @staticmethod
+    def _swap_and_flip(vectors, out=None):
+        """Swap the first two components and negate the third (NED <-> ENU)."""
+        vectors = np.asarray(vectors)
+        if vectors.shape[-1] != 3:
+            raise ValueError("Vectors must have a last dimension of size 3")
+        # Fancy indexing copies, so `out` may safely alias the input
+        return np.multiply(vectors[..., [1, 0, 2]], _SWAP_FLIP_SIGNS, out=out)
     
     def ecef_to_horizon(self, target_ecef):
         """ Convert ECEF target to local horizon (az, el, range). """
@@ -105,6 +243,45 @@ class ECEFConverter:
         
         return az, el, rng
     
+    def ecef_to_horizon_batch(self, targets_ecef, min_elevation=None, visible_only=False):
+        """
+        Convert an (N,3) array of ECEF targets to local horizon coordinates.
+        
+        Args:
+            targets_ecef (ndarray): (N,3) target positions in meters
+            min_elevation (float): Elevation threshold in degrees (optional).
+                When given, a boolean visibility mask is returned as well.
+            visible_only (bool): Only compute az/range for targets above
+                `min_elevation`; the result then holds the visible rows only.
+        
+        Returns:
+            Structured array with fields 'az', 'el', 'range' (degrees, meters),
+            or (horizon, visible) when `min_elevation` is set.
+        """
+        if visible_only and min_elevation is None:
+            raise ValueError("visible_only requires min_elevation")
+        
+        enu = self.ecef_to_enu(np.asarray(targets_ecef) - self.obs_ecef)
+        e, n, u = enu[:, 0], enu[:, 1], enu[:, 2]
+        
+        # Elevation first, so the visibility mask can prune the rest
+        horiz2 = e*e + n*n
+        el = np.degrees(np.arctan2(u, np.sqrt(horiz2)))
+        visible = None
+        if min_elevation is not None:
+            visible = el >= min_elevation
+            if visible_only:
+                e, n, u, horiz2, el = e[visible], n[visible], u[visible], horiz2[visible], el[visible]
+        
+        horizon = np.empty(el.shape[0], dtype=HORIZON_DTYPE)
+        horizon['az'] = np.degrees(np.arctan2(e, n)) % 360.0
+        horizon['el'] = el
+        horizon['range'] = np.sqrt(horiz2 + u*u)
+        
+        if visible is None:
+            return horizon
+        return horizon, visible
+    
     def _rotation_matrix_body(self, yaw, pitch, roll):
         """Rotation matrix from NED -> Body (radians)."""
         
@@ -141,6 +318,134 @@ class ECEFConverter:
         
         return body_vec
     
+    def _rotation_matrix_body_batch(self, yaw, pitch, roll):
+        """
+        Stack of NED -> Body rotation matrices (radians), shape (N,3,3).
+        
+        Closed form of Rx @ Ry @ Rz, so no per-sample matrix products.
+        """
+        return ned_to_body_dcm(yaw, pitch, roll)
+    
+    def ecef_to_body_batch(self, targets_ecef, yaw_deg, pitch_deg, roll_deg):
+        """
+        Convert ECEF targets to Body frame for a time series of attitudes.
+        
+        Args:
+            targets_ecef (ndarray): (N,3) targets, or a single 3-vector seen
+                from every attitude
+            yaw_deg, pitch_deg, roll_deg (ndarray): (N,) attitude angles in degrees
+        
+        Returns:
+            (N,3) array of Body frame coordinates.
+        """
+        ned = self.ecef_to_ned(np.asarray(targets_ecef) - self.obs_ecef)
+        R_body = self._rotation_matrix_body_batch(*map(np.radians, (yaw_deg, pitch_deg, roll_deg)))
+        return np.einsum('nij,nj->ni', R_body, np.broadcast_to(ned, R_body.shape[:-1]))
+    
+#------------------------------------------------------
+# Shared converter cache
+#------------------------------------------------------
+# Cache keys are rounded to ~1 cm in lat/lon and 1 mm in altitude
+_KEY_LATLON_DECIMALS = 7
+_KEY_ALT_DECIMALS = 3
+
+def get_converter(lat, lon, alt=0):
+    """
+    Return a frozen ECEFConverter for the reference site, building it only
+    the first time the (quantized) site is seen. The instance is shared, so
+    it must not be modified; use ECEFConverter directly for a private copy.
+    """
+    return _cached_converter(round(float(lat), _KEY_LATLON_DECIMALS),
+                             round(float(lon), _KEY_LATLON_DECIMALS),
+                             round(float(alt), _KEY_ALT_DECIMALS))
+
+@lru_cache(maxsize=1024)
+def _cached_converter(lat, lon, alt):
+    return ECEFConverter(lat, lon, alt).freeze()
+
+def clear_converter_cache():
+    """Drop every cached converter."""
+    _cached_converter.cache_clear()
+    
+#------------------------------------------------------
+# Multi-observer engine
+#------------------------------------------------------
+class MultiObserverConverter:
+    """
+    Evaluate ENU/NED/horizon results for M reference sites against N targets.
+    
+    The per-site rotation matrices are stacked into an (M,3,3) tensor and all
+    site/target pairs are evaluated with broadcasting. Targets are processed
+    in chunks so the temporary (M,chunk,3) arrays stay bounded for large grids.
+    
+    Args:
+        sites (iterable): (lat, lon) or (lat, lon, alt) tuples in degrees/meters
+        chunk_elements (int): Approximate number of site/target pairs per chunk
+    """
+    
+    def __init__(self, sites, chunk_elements=1_000_000):
+        self.converters = [get_converter(*site) for site in sites]
+        if not self.converters:
+            raise ValueError("At least one site must be provided")
+        
+        self.R_ecef_to_enu = np.stack([c.R_ecef_to_enu for c in self.converters])
+        self.R_ecef_to_ned = np.stack([c.R_ecef_to_ned for c in self.converters])
+        self.obs_ecef = np.stack([c.obs_ecef for c in self.converters])
+        self.chunk_elements = chunk_elements
+        
+    def __len__(self):
+        return len(self.converters)
+    
+    def _chunks(self, n_targets, chunk_size):
+        """Yield target slices so that M x chunk pairs stay near chunk_elements."""
+        if chunk_size is None:
+            chunk_size = max(1, self.chunk_elements // len(self))
+        for start in range(0, n_targets, chunk_size):
+            yield slice(start, min(start + chunk_size, n_targets))
+    
+    def _relative_frame(self, R_stack, targets_ecef, chunk_size):
+        targets_ecef = np.asarray(targets_ecef, dtype=float)
+        out = np.empty((len(self), targets_ecef.shape[0], 3))
+        R_T = R_stack.transpose(0, 2, 1)
+        for sl in self._chunks(targets_ecef.shape[0], chunk_size):
+            rel = targets_ecef[None, sl, :] - self.obs_ecef[:, None, :]
+            np.matmul(rel, R_T, out=out[:, sl, :])
+        return out
+    
+    def relative_enu(self, targets_ecef, chunk_size=None):
+        """ENU position of every target relative to every site, shape (M,N,3)."""
+        return self._relative_frame(self.R_ecef_to_enu, targets_ecef, chunk_size)
+    
+    def relative_ned(self, targets_ecef, chunk_size=None):
+        """NED position of every target relative to every site, shape (M,N,3)."""
+        return self._relative_frame(self.R_ecef_to_ned, targets_ecef, chunk_size)
+    
+    def ecef_to_horizon(self, targets_ecef, min_elevation=None, chunk_size=None):
+        """
+        Look angles from every site to every target.
+        
+        Returns:
+            (M,N) structured array with fields 'az', 'el', 'range', or
+            (horizon, visible) when `min_elevation` (degrees) is set.
+        """
+        targets_ecef = np.asarray(targets_ecef, dtype=float)
+        horizon = np.empty((len(self), targets_ecef.shape[0]), dtype=HORIZON_DTYPE)
+        R_T = self.R_ecef_to_enu.transpose(0, 2, 1)
+        
+        for sl in self._chunks(targets_ecef.shape[0], chunk_size):
+            rel = targets_ecef[None, sl, :] - self.obs_ecef[:, None, :]
+            enu = np.matmul(rel, R_T)
+            e, n, u = enu[..., 0], enu[..., 1], enu[..., 2]
+            horiz2 = e*e + n*n
+            
+            horizon['az'][:, sl] = np.degrees(np.arctan2(e, n)) % 360.0
+            horizon['el'][:, sl] = np.degrees(np.arctan2(u, np.sqrt(horiz2)))
+            horizon['range'][:, sl] = np.sqrt(horiz2 + u*u)
+        
+        if min_elevation is None:
+            return horizon
+        return horizon, horizon['el'] >= min_elevation
+    
 #------------------------------------------------------
 # Example usage
 #------------------------------------------------------
@@ -172,4 +477,38 @@ if __name__ == "__main__":
     
     # Aircraft orientation (yaw=90deg, pitch=5deg, roll=2deg)
     body_coords = new_converter.ecef_to_body(target_ecef, 90, 5, 2)
-    print("Target in Body frame:", body_coords)
\ No newline at end of file
+    print("Target in Body frame:", body_coords)
+    
+    # Batched conversion of a whole track (N,3) in one call
+    track_ecef = np.array([[1000, 2000, 3000],
+                           [1500, 2500, 3500],
+                           [2000, 3000, 4000]], dtype=float)
+    track_enu = np.empty_like(track_ecef)
+    converter.ecef_to_enu(track_ecef, out=track_enu)
+    print("Track ENU:\n", track_enu)
+    print("Track NED from ENU:\n", converter.enu_to_ned(track_enu))
+    
+    # Look angles to many targets at once, keeping only those above 10deg
+    targets = target_ecef + np.random.default_rng(0).uniform(-2e6, 2e6, size=(5, 3))
+    horizon, visible = new_converter.ecef_to_horizon_batch(targets, min_elevation=10.0)
+    print("Horizon (az, el, range):\n", horizon)
+    print("Visible:", visible)
+    
+    # Inverse conversion back to geodetic coordinates
+    lat, lon, alt = new_converter.ecef_to_lla(new_converter.obs_ecef)
+    print(f"Observer LLA: {lat:.6f}deg, {lon:.6f}deg, {alt:.3f} m")
+    
+    # Converters for the same site are built once and shared
+    site = get_converter(40.0, -105.0, 1600)
+    print("Cached converter reused:", site is get_converter(40.0, -105.0, 1600.0))
+    
+    # Several ground stations against the same set of targets
+    stations = MultiObserverConverter([(40.0, -105.0, 1600), (37.7749, -122.4194), (47.6, -122.3, 50)])
+    grid, grid_visible = stations.ecef_to_horizon(targets, min_elevation=10.0)
+    print("Elevation grid (stations x targets):\n", grid['el'])
+    print("Visible per station:", grid_visible.sum(axis=1))
+    
+    # One target seen along an attitude time series
+    yaws = np.linspace(80, 100, 5)
+    body_series = new_converter.ecef_to_body_batch(target_ecef, yaws, 5, 2)
+    print("Target in Body frame over time:\n", body_series)
\ No newline at end of file
@@ -8,18 +8,39 @@ Created on Sat Sep 13 22:44:27 2025
 
 import math
 
+import numpy as np
+
+from rotation_conversions import (euler_to_quat, matrix_to_quat, quat_to_euler,
+                                  quat_to_matrix)
+
+# Sign pattern that turns (w, x, y, z) into its conjugate
+_CONJUGATE_SIGNS = np.array([1.0, -1.0, -1.0, -1.0])
+
 class Quaternion:
-    def __init__(self, w, x, y, z):
+    """
+    Quaternion (w, x, y, z) with a compact slotted layout.
+    
+    `is_unit` marks quaternions known to have unit norm (set by normalize()
+    and the factory methods), letting inverse() and rotate_vector() skip the
+    norm. Call normalize() again after editing the components by hand.
+    """
+    
+    __slots__ = ("w", "x", "y", "z", "is_unit")
+    
+    def __init__(self, w, x, y, z, is_unit=False):
         self.w = w
         self.x = x
         self.y = y
         self.z = z
+        self.is_unit = is_unit
         
     def __repr__(self):
         return f"Quaternion({self.w:.4f}, {self.x:.4f}, {self.y:.4f}, {self.z:.4f})"
     
     def __mul__(self, other):
         """Hamiliton product"""
+        if not isinstance(other, Quaternion):
+            return NotImplemented # lets QuaternionArray.__rmul__ handle arrays
         w1, x1, y1, z1 = self.w, self.x, self.y, self.z
         w2, x2, y2, z2 = other.w, other.x, other.y, other.z 
         
@@ -27,11 +48,26 @@ class Quaternion:
             w1*w2 - x1*x2 - y1*y2 - z1*z2,
             w1*x2 + x1*w2 + y1*z2 - z1*y2,
             w1*y2 - x1*z2 + y1*w2 + z1*x2,
-            w1*z2 + x1*y2 - y1*x2 + z1*w2
+            w1*z2 + x1*y2 - y1*x2 + z1*w2,
+            self.is_unit and other.is_unit
         )
     
+    def __imul__(self, other):
+        """In-place Hamilton product (self = self * other) without allocating"""
+        if not isinstance(other, Quaternion):
+            return NotImplemented
+        w1, x1, y1, z1 = self.w, self.x, self.y, self.z
+        w2, x2, y2, z2 = other.w, other.x, other.y, other.z
+        
+        self.w = w1*w2 - x1*x2 - y1*y2 - z1*z2
+        self.x = w1*x2 + x1*w2 + y1*z2 - z1*y2
+        self.y = w1*y2 - x1*z2 + y1*w2 + z1*x2
+        self.z = w1*z2 + x1*y2 - y1*x2 + z1*w2
+        self.is_unit = self.is_unit and other.is_unit
+        return self
+    
     def conjugate(self):
-        return Quaternion(self.w, -self.x, -self.y, -self.z)
+        return Quaternion(self.w, -self.x, -self.y, -self.z, self.is_unit)
     
     def norm(self):
         return math.sqrt(self.w**2 + self.x**2 + self.y**2 + self.z**2)
@@ -44,9 +80,12 @@ class Quaternion:
         self.x /= n
         self.y /= n
         self.z /= n
+        self.is_unit = True
         return self
     
     def inverse(self):
+        if self.is_unit:
+            return self.conjugate()
         conj = self.conjugate()
         n2 = self.norm()**2
         return Quaternion(conj.w/n2, conj.x/n2, conj.y/n2, conj.z/n2)
@@ -62,9 +101,17 @@ class Quaternion:
     def rotate_vector(self, v):
         if len(v) != 3:
             raise ValueError("Vector must be 3-dimensional")
-        q_vec = Quaternion(0, *v)
-        q_rot = self * q_vec * self.inverse()
-        return (q_rot.x, q_rot.y, q_rot.z)
+        w, x, y, z = self.w, self.x, self.y, self.z
+        vx, vy, vz = v
+        
+        # Expanded q * v * q^-1: v' = v + w*t + q x t with t = 2(q x v)/|q|^2
+        s = 2.0 if self.is_unit else 2.0 / (w*w + x*x + y*y + z*z)
+        tx = s * (y*vz - z*vy)
+        ty = s * (z*vx - x*vz)
+        tz = s * (x*vy - y*vx)
+        return (vx + w*tx + (y*tz - z*ty),
+                vy + w*ty + (z*tx - x*tz),
+                vz + w*tz + (x*ty - y*tx))
     
     
     #----------------------------
@@ -85,7 +132,7 @@ class Quaternion:
         half_angle = angle_rad / 2
         w = math.cos(half_angle)
         sin_half = math.sin(half_angle)
-        return cls(w, x*sin_half, y*sin_half, z*sin_half)
+        return cls(w, x*sin_half, y*sin_half, z*sin_half, is_unit=True)
     
     @classmethod
     def from_euler(cls, roll, pitch, yaw):
@@ -103,6 +150,261 @@ class Quaternion:
         z = cr * cp * sy - sr * sp * cy
         
         return cls(w, x, y, z).normalize()
+    
+    @classmethod
+    def from_rotation_matrix(cls, R):
+        """Create a unit quaternion from a 3x3 rotation matrix."""
+        return cls(*matrix_to_quat(R)[0].tolist(), is_unit=True)
+    
+    def to_euler(self):
+        """Return (roll, pitch, yaw) in radians."""
+        roll, pitch, yaw = quat_to_euler([self.w, self.x, self.y, self.z])
+        return float(roll[0]), float(pitch[0]), float(yaw[0])
+
+class QuaternionArray:
+    """
+    NumPy-backed array of N quaternions stored as an (N,4) array of (w, x, y, z).
+    
+    Mirrors the scalar Quaternion API for bulk data. Indexing with an int
+    returns a scalar Quaternion and products accept either type.
+    """
+    
+    def __init__(self, data):
+        data = np.array(data, dtype=float)
+        if data.ndim == 1:
+            data = data[np.newaxis, :]
+        if data.ndim != 2 or data.shape[1] != 4:
+            raise ValueError("Quaternion data must have shape (N, 4)")
+        self.data = data
+        
+    def __repr__(self):
+        return f"QuaternionArray({self.data!r})"
+    
+    def __len__(self):
+        return self.data.shape[0]
+    
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return Quaternion(*self.data[index].tolist())
+        return QuaternionArray(self.data[index])
+    
+    @property
+    def w(self):
+        return self.data[:, 0]
+    
+    @property
+    def vec(self):
+        """Vector part (x, y, z), shape (N,3)."""
+        return self.data[:, 1:]
+    
+    @staticmethod
+    def _as_array(q):
+        """(N,4) or (1,4) array view of a Quaternion or QuaternionArray."""
+        if isinstance(q, QuaternionArray):
+            return q.data
+        if isinstance(q, Quaternion):
+            return np.array([[q.w, q.x, q.y, q.z]])
+        return QuaternionArray(q).data
+    
+    def __mul__(self, other):
+        """Hamilton product, broadcasting a single quaternion over the array"""
+        return QuaternionArray(_hamilton_product(self.data, self._as_array(other)))
+    
+    def __rmul__(self, other):
+        return QuaternionArray(_hamilton_product(self._as_array(other), self.data))
+    
+    def conjugate(self):
+        return QuaternionArray(self.data * _CONJUGATE_SIGNS)
+    
+    def norm(self):
+        return np.sqrt(np.einsum('ij,ij->i', self.data, self.data))
+    
+    def normalize(self):
+        n = self.norm()
+        if np.any(n == 0):
+            raise ZeroDivisionError("Cannot normalize a zero quaternion")
+        self.data /= n[:, np.newaxis]
+        return self
+    
+    def inverse(self):
+        n2 = np.einsum('ij,ij->i', self.data, self.data)
+        return QuaternionArray(self.data * _CONJUGATE_SIGNS / n2[:, np.newaxis])
+    
+    def rotate_vectors(self, v):
+        """
+        Rotate (N,3) vectors, or one 3-vector by every quaternion.
+        
+        Uses v' = v + 2w(q x v) + 2q x (q x v), scaled by 1/|q|^2 so the
+        result matches Quaternion.rotate_vector for non-unit quaternions too.
+        """
+        v = np.asarray(v, dtype=float)
+        if v.shape[-1] != 3:
+            raise ValueError("Vectors must be 3-dimensional")
+        
+        w, q = self.w[:, np.newaxis], self.vec
+        n2 = np.einsum('ij,ij->i', self.data, self.data)[:, np.newaxis]
+        t = 2 * np.cross(q, v) / n2
+        return v + w * t + np.cross(q, t)
+    
+    #----------------------------
+    # Interop with the scalar class
+    #----------------------------
+    @classmethod
+    def from_quaternions(cls, quaternions):
+        return cls([[q.w, q.x, q.y, q.z] for q in quaternions])
+    
+    def to_quaternions(self):
+        return [Quaternion(*row) for row in self.data.tolist()]
+    
+    #----------------------------
+    # Rotation matrix / Euler conversions
+    #----------------------------
+    def to_rotation_matrices(self):
+        """(N,3,3) rotation matrices; assumes unit quaternions."""
+        return quat_to_matrix(self.data)
+    
+    def to_euler(self):
+        """Return (roll, pitch, yaw) arrays in radians."""
+        return quat_to_euler(self.data)
+    
+    @classmethod
+    def from_rotation_matrices(cls, R):
+        return cls(matrix_to_quat(R))
+    
+    @classmethod
+    def from_euler(cls, roll, pitch, yaw):
+        """Create quaternions from arrays of Euler angles in radians."""
+        return cls(euler_to_quat(roll, pitch, yaw))
+    
+    
+def _hamilton_product(p, q):
+    """Row-wise Hamilton product of two broadcastable (..., 4) arrays."""
+    w1, x1, y1, z1 = p[..., 0], p[..., 1], p[..., 2], p[..., 3]
+    w2, x2, y2, z2 = q[..., 0], q[..., 1], q[..., 2], q[..., 3]
+    
+    return np.stack([
+        w1*w2 - x1*x2 - y1*y2 - z1*z2,
+        w1*x2 + x1*w2 + y1*z2 - z1*y2,
+        w1*y2 - x1*z2 + y1*w2 + z1*x2,
+        w1*z2 + x1*y2 - y1*x2 + z1*w2
+    ], axis=-1)
+
+#------------------------------------------------------
+# Interpolation
+#------------------------------------------------------
+def nlerp(q0, q1, t):
+    """
+    Normalized linear interpolation between quaternion arrays.
+    
+    q0, q1 may be Quaternion, QuaternionArray or (N,4) arrays and t a scalar
+    or (N,) array of fractions in [0, 1]. Takes the shorter arc.
+    """
+    p, q = QuaternionArray._as_array(q0), QuaternionArray._as_array(q1)
+    t = np.asarray(t, dtype=float).reshape(-1, 1)
+    q = np.where(np.einsum('ij,ij->i', p, q)[:, np.newaxis] < 0, -q, q)
+    
+    return QuaternionArray((1 - t) * p + t * q).normalize()
+
+def slerp(q0, q1, t):
+    """
+    Spherical linear interpolation between quaternion arrays.
+    
+    Same arguments as nlerp(); falls back to nlerp where the two
+    quaternions are nearly parallel.
+    """
+    p, q = QuaternionArray._as_array(q0), QuaternionArray._as_array(q1)
+    t = np.asarray(t, dtype=float).reshape(-1, 1)
+    
+    p = p / np.linalg.norm(p, axis=1, keepdims=True)
+    q = q / np.linalg.norm(q, axis=1, keepdims=True)
+    dot = np.einsum('ij,ij->i', p, q)[:, np.newaxis]
+    q = np.where(dot < 0, -q, q)
+    dot = np.clip(np.abs(dot), 0.0, 1.0)
+    
+    theta = np.arccos(dot)
+    sin_theta = np.sin(theta)
+    near = sin_theta < 1e-6
+    safe_sin = np.where(near, 1.0, sin_theta)
+    w0 = np.where(near, 1 - t, np.sin((1 - t) * theta) / safe_sin)
+    w1 = np.where(near, t, np.sin(t * theta) / safe_sin)
+    
+    return QuaternionArray(w0 * p + w1 * q).normalize()
+
+_INTERPOLATORS = {"slerp": slerp, "nlerp": nlerp}
+
+def interpolate_attitude(times, quats, new_times, method="slerp"):
+    """
+    Resample an attitude series given as keyframe times (K,) and quaternions
+    (K,4) at `new_times`, which must lie within [times[0], times[-1]].
+    """
+    if method not in _INTERPOLATORS:
+        raise ValueError("Invalid method. Choose 'slerp' or 'nlerp'.")
+    times = np.asarray(times, dtype=float)
+    quats = QuaternionArray._as_array(quats)
+    new_times = np.asarray(new_times, dtype=float)
+    if len(times) < 2:
+        raise ValueError("At least two keyframes are required")
+    if new_times.size and (new_times.min() < times[0] or new_times.max() > times[-1]):
+        raise ValueError("new_times must lie within the keyframe time range")
+    
+    # Keyframe segment that contains each output time
+    idx = np.clip(np.searchsorted(times, new_times, side='right') - 1, 0, len(times) - 2)
+    t = (new_times - times[idx]) / (times[idx + 1] - times[idx])
+    
+    return _INTERPOLATORS[method](quats[idx], quats[idx + 1], t)
+
+
+class AttitudeResampler:
+    """
+    Incrementally resample an attitude stream onto a fixed-rate time grid.
+    
+    Feed keyframe chunks in time order with update(); each call returns the
+    grid samples covered so far. Only the last keyframe is kept between
+    chunks, so the whole flight never has to be in memory.
+    
+    Args:
+        period (float): Output sample spacing, e.g. 1/200 for 200 Hz
+        start (float): Time of the first output sample (defaults to the
+            first keyframe time)
+        method (str): 'slerp' or 'nlerp'
+    """
+    
+    def __init__(self, period, start=None, method="slerp"):
+        if period <= 0:
+            raise ValueError("period must be positive")
+        if method not in _INTERPOLATORS:
+            raise ValueError("Invalid method. Choose 'slerp' or 'nlerp'.")
+        self.period = period
+        self.start = start
+        self.method = method
+        self._k = 0 # index of the next grid sample to emit
+        self._last_time = None
+        self._last_quat = None
+        
+    def update(self, times, quats):
+        """
+        Consume a chunk of keyframes, returning (sample_times, QuaternionArray).
+        """
+        times = np.asarray(times, dtype=float)
+        quats = QuaternionArray._as_array(quats)
+        if self._last_time is not None:
+            times = np.concatenate(([self._last_time], times))
+            quats = np.vstack((self._last_quat, quats))
+        if self.start is None:
+            self.start = times[0]
+        
+        self._last_time, self._last_quat = times[-1], quats[-1:]
+        if len(times) < 2:
+            return np.empty(0), QuaternionArray(np.empty((0, 4)))
+        
+        # Grid samples up to the last keyframe, skipping any before the data
+        k_first = max(self._k, int(np.ceil((times[0] - self.start) / self.period)))
+        k_last = int(np.floor((times[-1] - self.start) / self.period))
+        ks = np.arange(k_first, k_last + 1)
+        sample_times = np.clip(self.start + ks * self.period, times[0], times[-1])
+        self._k = max(self._k, k_last + 1)
+        
+        return sample_times, interpolate_attitude(times, quats, sample_times, self.method)
 
 #------------------------------------------------------
 # Example usage
@@ -124,4 +426,21 @@ if __name__ == "__main__":
     # Rotate a vector using the quaternion
     v = (1, 0, 0)
     v_rot = q1.rotate_vector(v)
-    print("Rotated vector:", v_rot)
\ No newline at end of file
+    print("Rotated vector:", v_rot)
+    
+    # Rotate many vectors at once with an array of quaternions
+    qa = QuaternionArray.from_quaternions([q1, q2])
+    vectors = [(1, 0, 0), (0, 1, 0)]
+    print("Rotated vectors:\n", qa.rotate_vectors(vectors))
+    
+    # Halfway between identity and a 90deg yaw
+    identity = Quaternion(1, 0, 0, 0, is_unit=True)
+    print("SLERP halfway:", slerp(identity, q1, 0.5)[0])
+    
+    # Resample a 10 Hz attitude stream to 50 Hz, one chunk at a time
+    key_times = np.arange(0, 1.01, 0.1)
+    key_quats = QuaternionArray([[math.cos(a/2), 0, 0, math.sin(a/2)] for a in np.linspace(0, math.pi/2, len(key_times))])
+    resampler = AttitudeResampler(period=1/50)
+    for chunk in (slice(0, 5), slice(5, None)):
+        sample_times, samples = resampler.update(key_times[chunk], key_quats[chunk])
+        print(f"Chunk produced {len(samples)} samples up to t={sample_times[-1]:.2f}s")
\ No newline at end of file
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Vectorized conversions between quaternions, rotation matrices and Euler angles.
+
+Shared backend for quaternion_class and ecef_converter_class. Every function
+works on stacks: quaternions are (N,4) arrays of (w, x, y, z), matrices are
+(N,3,3) and Euler angles are (N,) arrays in radians using the aerospace
+ZYX sequence (yaw, then pitch, then roll).
+
+Rotation matrices are active (they rotate vectors), matching
+Quaternion.to_rotation_matrix. ned_to_body_dcm() gives the passive
+NED -> Body direction cosine matrix used by ECEFConverter.
+"""
+
+import numpy as np
+
+
+def _as_quat_array(q):
+    q = np.asarray(q, dtype=float)
+    if q.shape[-1] != 4:
+        raise ValueError("Quaternions must have a last dimension of size 4")
+    return q.reshape(-1, 4)
+
+def _as_matrix_stack(R):
+    R = np.asarray(R, dtype=float)
+    if R.shape[-2:] != (3, 3):
+        raise ValueError("Rotation matrices must have shape (..., 3, 3)")
+    return R.reshape(-1, 3, 3)
+
+def _as_angles(*angles):
+    return np.broadcast_arrays(*(np.atleast_1d(np.asarray(a, dtype=float)) for a in angles))
+
+
+def quat_to_matrix(q):
+    """Unit quaternions (N,4) -> active rotation matrices (N,3,3)."""
+    q = _as_quat_array(q)
+    w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    
+    R = np.empty((q.shape[0], 3, 3))
+    R[:, 0, 0] = 1 - 2*(y**2 + z**2)
+    R[:, 0, 1] = 2*(x*y - z*w)
+    R[:, 0, 2] = 2*(x*z + y*w)
+    R[:, 1, 0] = 2*(x*y + z*w)
+    R[:, 1, 1] = 1 - 2*(x**2 + z**2)
+    R[:, 1, 2] = 2*(y*z - x*w)
+    R[:, 2, 0] = 2*(x*z - y*w)
+    R[:, 2, 1] = 2*(y*z + x*w)
+    R[:, 2, 2] = 1 - 2*(x**2 + y**2)
+    return R
+
+def matrix_to_quat(R):
+    """
+    Active rotation matrices (N,3,3) -> unit quaternions (N,4) with w >= 0.
+    
+    Shepperd's method: each matrix uses whichever of w, x, y, z is largest
+    as the pivot, which keeps the square root and division well-conditioned
+    for every rotation, including those near 180 degrees.
+    """
+    R = _as_matrix_stack(R)
+    R00, R01, R02 = R[:, 0, 0], R[:, 0, 1], R[:, 0, 2]
+    R10, R11, R12 = R[:, 1, 0], R[:, 1, 1], R[:, 1, 2]
+    R20, R21, R22 = R[:, 2, 0], R[:, 2, 1], R[:, 2, 2]
+    
+    trace = R00 + R11 + R22
+    pivot = np.argmax(np.stack([trace, R00, R11, R22], axis=1), axis=1)
+    q = np.empty((R.shape[0], 4))
+    
+    m = pivot == 0
+    s = 2 * np.sqrt(1 + trace[m])
+    q[m] = np.stack([0.25 * s, (R21[m] - R12[m]) / s, (R02[m] - R20[m]) / s, (R10[m] - R01[m]) / s], axis=1)
+    
+    m = pivot == 1
+    s = 2 * np.sqrt(1 + R00[m] - R11[m] - R22[m])
+    q[m] = np.stack([(R21[m] - R12[m]) / s, 0.25 * s, (R01[m] + R10[m]) / s, (R02[m] + R20[m]) / s], axis=1)
+    
+    m = pivot == 2
+    s = 2 * np.sqrt(1 - R00[m] + R11[m] - R22[m])
+    q[m] = np.stack([(R02[m] - R20[m]) / s, (R01[m] + R10[m]) / s, 0.25 * s, (R12[m] + R21[m]) / s], axis=1)
+    
+    m = pivot == 3
+    s = 2 * np.sqrt(1 - R00[m] - R11[m] + R22[m])
+    q[m] = np.stack([(R10[m] - R01[m]) / s, (R02[m] + R20[m]) / s, (R12[m] + R21[m]) / s, 0.25 * s], axis=1)
+    
+    # q and -q are the same rotation; pick the w >= 0 representative
+    q[q[:, 0] < 0] *= -1
+    return q
+
+def euler_to_quat(roll, pitch, yaw):
+    """Euler angles (radians) -> unit quaternions (N,4), as Quaternion.from_euler."""
+    roll, pitch, yaw = _as_angles(roll, pitch, yaw)
+    cy, sy = np.cos(yaw * 0.5), np.sin(yaw * 0.5)
+    cp, sp = np.cos(pitch * 0.5), np.sin(pitch * 0.5)
+    cr, sr = np.cos(roll * 0.5), np.sin(roll * 0.5)
+    
+    q = np.stack([
+        cr * cp * cy + sr * sp * sy,
+        sr * cp * cy - cr * sp * sy,
+        cr * sp * cy + sr * cp * sy,
+        cr * cp * sy - sr * sp * cy
+    ], axis=1)
+    return q / np.linalg.norm(q, axis=1, keepdims=True)
+
+def quat_to_euler(q):
+    """Unit quaternions (N,4) -> (roll, pitch, yaw) arrays in radians."""
+    q = _as_quat_array(q)
+    w, x, y, z = q[:, 0], q[:, 1], q[:, 2], q[:, 3]
+    
+    roll = np.arctan2(2*(w*x + y*z), 1 - 2*(x**2 + y**2))
+    pitch = np.arcsin(np.clip(2*(w*y - z*x), -1.0, 1.0))
+    yaw = np.arctan2(2*(w*z + x*y), 1 - 2*(y**2 + z**2))
+    return roll, pitch, yaw
+
+def euler_to_matrix(roll, pitch, yaw):
+    """Euler angles (radians) -> active rotation matrices Rz @ Ry @ Rx, (N,3,3)."""
+    roll, pitch, yaw = _as_angles(roll, pitch, yaw)
+    cy, sy = np.cos(yaw), np.sin(yaw)
+    cp, sp = np.cos(pitch), np.sin(pitch)
+    cr, sr = np.cos(roll), np.sin(roll)
+    
+    R = np.empty(yaw.shape + (3, 3))
+    R[..., 0, 0] = cy*cp
+    R[..., 0, 1] = cy*sp*sr - sy*cr
+    R[..., 0, 2] = cy*sp*cr + sy*sr
+    R[..., 1, 0] = sy*cp
+    R[..., 1, 1] = sy*sp*sr + cy*cr
+    R[..., 1, 2] = sy*sp*cr - cy*sr
+    R[..., 2, 0] = -sp
+    R[..., 2, 1] = cp*sr
+    R[..., 2, 2] = cp*cr
+    return R
+
+def matrix_to_euler(R):
+    """Active rotation matrices (N,3,3) -> (roll, pitch, yaw) arrays in radians."""
+    R = _as_matrix_stack(R)
+    roll = np.arctan2(R[:, 2, 1], R[:, 2, 2])
+    pitch = -np.arcsin(np.clip(R[:, 2, 0], -1.0, 1.0))
+    yaw = np.arctan2(R[:, 1, 0], R[:, 0, 0])
+    return roll, pitch, yaw
+
+def ned_to_body_dcm(yaw, pitch, roll):
+    """
+    NED -> Body direction cosine matrices (N,3,3) for attitudes in radians.
+    
+    This is the transpose of euler_to_matrix(), i.e. Rx @ Ry @ Rz as built
+    by ECEFConverter._rotation_matrix_body.
+    """
+    return euler_to_matrix(roll, pitch, yaw).swapaxes(-1, -2)
@@ -6,9 +6,211 @@ Created on Sun Sep 14 18:59:27 2025
 @author: kpetchsaiprasert
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import pandas as pd
-from scipy import stats
+from scipy import special, stats
+
+try:
+    from scipy.stats._stats import _kendall_dis # merge-sort discordant pair count used by stats.kendalltau
+except ImportError: # private scipy helper; fall back to stats.kendalltau per pair
+    _kendall_dis = None
+
+def _pvalues_from_r(r, n):
+    """
+    Two-sided p-values for a correlation matrix using the t-distribution
+    with n - 2 degrees of freedom. `n` may be a scalar or a matrix of
+    per-pair sample counts. Only the upper triangle is evaluated.
+    """
+    k = r.shape[0]
+    iu = np.triu_indices(k, 1)
+    r_upper = r[iu]
+    dof = (np.broadcast_to(n, r.shape)[iu] - 2).astype(float)
+    
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = r_upper * np.sqrt(dof / (1 - r_upper**2))
+    p_upper = 2 * stats.t.sf(np.abs(t), dof)
+    
+    p = np.zeros((k, k))
+    p[iu] = p_upper
+    p.T[iu] = p_upper
+    return p
+
+# ----- Kendall matrix helpers (module level so worker processes can pickle them) -----
+_worker_ranks = None
+_worker_perms = None
+_worker_ties = None
+
+def _init_kendall_worker(ranks, perms, ties):
+    global _worker_ranks, _worker_perms, _worker_ties
+    _worker_ranks, _worker_perms, _worker_ties = ranks, perms, ties
+
+def _dense_ranks(X):
+    """Sort order of each column and its dense integer ranks (one argsort per column)."""
+    perms = np.argsort(X, axis=0)
+    ranks = np.empty(X.shape, dtype=np.intp)
+    for j in range(X.shape[1]):
+        xs = X[perms[:, j], j]
+        ranks[perms[:, j], j] = np.cumsum(np.r_[True, xs[1:] != xs[:-1]])
+    return ranks, perms
+
+def _rank_tie_counts(ranks):
+    """Tied pairs and the two tie sums of the tau-b variance for one column of dense ranks."""
+    cnt = np.bincount(ranks).astype(np.int64)
+    cnt = cnt[cnt > 1]
+    return (int((cnt * (cnt - 1) // 2).sum()),
+            int((cnt * (cnt - 1.) * (cnt - 2)).sum()),
+            int((cnt * (cnt - 1.) * (2*cnt + 5)).sum()))
+
+def _kendall_row(ranks, perms, ties, i):
+    """
+    Kendall tau-b and p-values of column i against every column j > i.
+    
+    Reuses the sort order of column i and the per-column tie counts, so
+    each pair only gathers column j in that order (sorting within ties of
+    column i) and counts its discordant pairs. Columns with NaNs (tie
+    counts None) give NaN. The statistics follow stats.kendalltau, which
+    is still used for the exact small-sample p-value.
+    """
+    n, k = ranks.shape
+    taus = np.full(k - i - 1, np.nan)
+    pvals = np.full(k - i - 1, np.nan)
+    if ties[i] is None:
+        return i, taus, pvals
+    if _kendall_dis is None:
+        for out, j in enumerate(range(i + 1, k)):
+            taus[out], pvals[out] = stats.kendalltau(ranks[:, i], ranks[:, j])
+        return i, taus, pvals
+    
+    perm = perms[:, i]
+    x = ranks[perm, i]
+    # Rows inside tied groups of column i, which need column j sorted within the group
+    x_start = np.r_[True, x[1:] != x[:-1]]
+    x_group = np.cumsum(x_start) - 1
+    tied = np.bincount(x_group)[x_group] > 1
+    tied_rows = np.flatnonzero(tied)
+    
+    xtie, x0, x1 = ties[i]
+    tot = n * (n - 1) // 2
+    for out, j in enumerate(range(i + 1, k)):
+        if ties[j] is None:
+            continue
+        y = ranks[perm, j]
+        if tied_rows.size:
+            key = x_group[tied_rows] * (n + 1) + y[tied_rows]
+            y[tied_rows] = y[tied_rows][np.argsort(key, kind="stable")]
+        
+        dis = int(_kendall_dis(x, y))
+        obs = np.r_[True, (x[1:] != x[:-1]) | (y[1:] != y[:-1]), True]
+        cnt = np.diff(np.flatnonzero(obs)).astype(np.int64)
+        ntie = int((cnt * (cnt - 1) // 2).sum()) # joint ties
+        ytie, y0, y1 = ties[j]
+        if xtie == tot or ytie == tot:
+            continue
+        
+        con_minus_dis = tot - xtie - ytie + ntie - 2 * dis
+        taus[out] = min(1., max(-1., con_minus_dis / np.sqrt(tot - xtie) / np.sqrt(tot - ytie)))
+        if xtie == 0 and ytie == 0 and (n <= 33 or min(dis, tot - dis) <= 1):
+            pvals[out] = stats.kendalltau(ranks[:, i], ranks[:, j]).pvalue
+        else:
+            m = n * (n - 1.)
+            var = ((m * (2*n + 5) - x1 - y1) / 18 +
+                   (2 * xtie * ytie) / m + x0 * y0 / (9 * m * (n - 2)))
+            pvals[out] = 2 * special.ndtr(-abs(con_minus_dis / np.sqrt(var)))
+    return i, taus, pvals
+
+def _kendall_row_worker(i):
+    return _kendall_row(_worker_ranks, _worker_perms, _worker_ties, i)
+
+def _resolve_n_jobs(n_jobs):
+    if n_jobs is None or n_jobs == 0:
+        return 1
+    if n_jobs < 0:
+        return os.cpu_count() or 1
+    return n_jobs
+
+# ----- Resampling helpers (module level so worker processes can pickle them) -----
+def _rowwise_pearson(X, Y):
+    """Pearson r between matching rows of two (B, n) arrays."""
+    Xc = X - X.mean(axis=1, keepdims=True)
+    Yc = Y - Y.mean(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.einsum('ij,ij->i', Xc, Yc) / np.sqrt(
+            np.einsum('ij,ij->i', Xc, Xc) * np.einsum('ij,ij->i', Yc, Yc))
+
+def _permutation_batch(task):
+    """Correlations of x against `size` random permutations of y."""
+    zx, zy, size, seed_seq = task
+    rng = np.random.default_rng(seed_seq)
+    idx = rng.permuted(np.broadcast_to(np.arange(zy.size), (size, zy.size)), axis=1)
+    return zy[idx] @ zx
+
+def _bootstrap_batch(task):
+    """Correlations of `size` bootstrap resamples of the (x, y) pairs."""
+    x, y, method, size, seed_seq = task
+    rng = np.random.default_rng(seed_seq)
+    idx = rng.integers(0, x.size, size=(size, x.size))
+    X, Y = x[idx], y[idx]
+    if method == "spearman":
+        X, Y = stats.rankdata(X, axis=1), stats.rankdata(Y, axis=1)
+    return _rowwise_pearson(X, Y)
+
+def _run_batches(func, tasks, n_jobs):
+    n_jobs = _resolve_n_jobs(n_jobs)
+    if n_jobs == 1:
+        return np.concatenate([func(task) for task in tasks])
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        return np.concatenate(list(pool.map(func, tasks)))
+
+def _batch_seeds(n_resamples, batch_size, seed):
+    """Batch sizes and one independent seed stream per batch.
+    
+    The streams depend only on `seed` and the batch layout, so results are
+    reproducible whatever the number of workers.
+    """
+    sizes = [batch_size] * (n_resamples // batch_size)
+    if n_resamples % batch_size:
+        sizes.append(n_resamples % batch_size)
+    return zip(sizes, np.random.SeedSequence(seed).spawn(len(sizes)))
+
+# ----- Rolling correlation helper -----
+def _window_comoments(X, start, end, chunk_rows):
+    """
+    Co-moment matrices of X over the windows [start, end) (start and end
+    non-decreasing). Running totals are restarted at start[0] and centered on
+    the mean of the rows the windows span, so rounding grows with the span of
+    this block rather than the whole series. Totals are accumulated
+    chunk_rows rows at a time and only kept at the window edges.
+    """
+    lo, hi = start[0], end[-1]
+    k = X.shape[1]
+    center = X[lo:hi].mean(axis=0)
+    
+    edges, inverse = np.unique(np.concatenate([start, end]) - lo, return_inverse=True)
+    sums = np.zeros((len(edges), k))
+    cross = np.zeros((len(edges), k, k))
+    run_sum, run_cross = np.zeros(k), np.zeros((k, k))
+    j = np.searchsorted(edges, 0, side="right")  # totals at edge 0 stay zero
+    for p in range(0, hi - lo, chunk_rows):
+        q = min(p + chunk_rows, hi - lo)
+        Xc = X[lo + p:lo + q] - center
+        csum = np.cumsum(Xc, axis=0)
+        ccross = np.cumsum(Xc[:, :, np.newaxis] * Xc[:, np.newaxis, :], axis=0)
+        j_end = np.searchsorted(edges, q, side="right")
+        pos = edges[j:j_end] - p - 1
+        sums[j:j_end] = run_sum + csum[pos]
+        cross[j:j_end] = run_cross + ccross[pos]
+        run_sum += csum[-1]
+        run_cross += ccross[-1]
+        j = j_end
+    
+    inverse = inverse.ravel()
+    first, last = inverse[:len(start)], inverse[len(start):]
+    n = (end - start).astype(float)[:, np.newaxis, np.newaxis]
+    s = sums[last] - sums[first]
+    return (cross[last] - cross[first]) - s[:, :, np.newaxis] * s[:, np.newaxis, :] / n
 
 class Correlation:
     def __init__(self, x=None, y=None, df=None):
@@ -47,43 +249,222 @@ class Correlation:
         r, p = stats.kendalltau(self.x, self.y)
         return {"method": "kendall", "correlation": r, "p_value": p}
     
+    # ----- Resampling Significance -----
+    def _resampling_inputs(self, method):
+        if self.x is None or self.y is None:
+            raise ValueError("x and y must be provided for resampling tests")
+        if method not in ("pearson", "spearman"):
+            raise ValueError("Invalid method. Choose 'pearson' or 'spearman'.")
+        observed = self.pearson() if method == "pearson" else self.spearman()
+        return self.x.astype(float), self.y.astype(float), observed["correlation"]
+    
+    def permutation_test(self, method="pearson", n_resamples=10000, batch_size=1000,
+                         seed=None, n_jobs=1):
+        """
+        Two-sided permutation p-value for the x/y correlation.
+        
+        Permutation index matrices are drawn batch_size at a time and every
+        replicate correlation in a batch is one matrix-vector product of the
+        pre-standardized data. Batches can run on n_jobs processes.
+        """
+        x, y, r_obs = self._resampling_inputs(method)
+        if method == "spearman":
+            x, y = stats.rankdata(x), stats.rankdata(y)
+        zx = (x - x.mean()) / (x.std() * np.sqrt(x.size))
+        zy = (y - y.mean()) / (y.std() * np.sqrt(y.size))
+        
+        tasks = [(zx, zy, size, ss) for size, ss in _batch_seeds(n_resamples, batch_size, seed)]
+        r_perm = _run_batches(_permutation_batch, tasks, n_jobs)
+        p = (np.sum(np.abs(r_perm) >= np.abs(r_obs) - 1e-12) + 1) / (n_resamples + 1)
+        
+        return {"method": method, "correlation": r_obs, "p_value": p, "n_resamples": n_resamples}
+    
+    def bootstrap_ci(self, method="pearson", confidence_level=0.95, n_resamples=10000,
+                     batch_size=1000, seed=None, n_jobs=1):
+        """
+        Percentile bootstrap confidence interval for the x/y correlation.
+        
+        Resamples (x, y) pairs in batches of index matrices and computes all
+        replicate correlations of a batch row-wise in one pass.
+        """
+        x, y, r_obs = self._resampling_inputs(method)
+        tasks = [(x, y, method, size, ss) for size, ss in _batch_seeds(n_resamples, batch_size, seed)]
+        r_boot = _run_batches(_bootstrap_batch, tasks, n_jobs)
+        
+        alpha = 1 - confidence_level
+        low, high = np.nanpercentile(r_boot, [100 * alpha / 2, 100 * (1 - alpha / 2)])
+        return {"method": method, "correlation": r_obs, "ci_low": low, "ci_high": high,
+                "standard_error": np.nanstd(r_boot, ddof=1), "n_resamples": n_resamples}
+    
     # ------ DataFrame Correlation -----
-    def _df_corr_with_pvalues(self, method="pearson"):
+    def _df_corr_with_pvalues(self, method="pearson", n_jobs=1, nan_policy="propagate"):
+        if nan_policy == "pairwise":
+            if method != "pearson":
+                raise ValueError("nan_policy='pairwise' is only supported for method='pearson'.")
+            return self._pairwise_complete_corr()
+        elif nan_policy != "propagate":
+            raise ValueError("Invalid nan_policy. Choose 'propagate' or 'pairwise'.")
+        
+        if method in ("pearson", "spearman"):
+            return self._matrix_corr_with_pvalues(method)
+        elif method == "kendall":
+            return self._kendall_matrix(n_jobs)
+        else:
+            raise ValueError("Invalid method. Choose 'pearson', 'spearman', or 'kendall'.")
+    
+    def _matrix_corr_with_pvalues(self, method):
+        """
+        Full Pearson/Spearman matrix in one matrix product.
+        
+        Columns are standardized once (ranked first for Spearman), so the
+        correlation matrix is Z.T @ Z / n and p-values come from the
+        t-distribution for the upper triangle only.
+        """
+        X = self.df.to_numpy(dtype=float)
+        if method == "spearman":
+            X = stats.rankdata(X, axis=0)
+        n = X.shape[0]
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            Z = (X - X.mean(axis=0)) / X.std(axis=0)
+        r = (Z.T @ Z) / n
+        np.clip(r, -1.0, 1.0, out=r)
+        np.fill_diagonal(r, 1.0)
+        
+        return self._to_frames(r, _pvalues_from_r(r, n))
+    
+    def _pairwise_complete_corr(self):
+        """
+        Pearson matrix where each pair uses the rows valid in both columns.
+        
+        Counts, sums and cross-sums over the pairwise-valid rows all come
+        from products with the validity mask, so no filtered copy of any
+        column pair is made.
+        """
+        X = self.df.to_numpy(dtype=float)
+        valid = ~np.isnan(X)
+        mask = valid.astype(float)
+        
+        # Center on the column means first to limit cancellation in the sums
+        X0 = np.where(valid, X - np.nanmean(X, axis=0), 0.0)
+        
+        counts = mask.T @ mask   # rows where both columns are present
+        sums = X0.T @ mask       # sums[i, j] = sum of column i over those rows
+        sq_sums = (X0**2).T @ mask
+        cross = X0.T @ X0
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = cross - sums * sums.T / counts
+            var = sq_sums - sums**2 / counts
+            r = cov / np.sqrt(var * var.T)
+        np.clip(r, -1.0, 1.0, out=r)
+        np.fill_diagonal(r, 1.0)
+        
+        return self._to_frames(r, _pvalues_from_r(r, counts))
+    
+    def _kendall_matrix(self, n_jobs=1):
+        """
+        Kendall tau-b matrix over the upper triangle of column pairs.
+        
+        Each column is sorted once into dense integer ranks and its tie
+        counts are taken once; every pair in a row of the triangle reuses
+        the sort order of that row's column (see _kendall_row). Rows are
+        fanned out to a process pool when n_jobs > 1.
+        """
+        X = self.df.to_numpy(dtype=float)
+        ranks, perms = _dense_ranks(X)
+        has_nan = np.isnan(X).any(axis=0)
+        ties = [None if has_nan[j] else _rank_tie_counts(ranks[:, j]) for j in range(X.shape[1])]
+        k = ranks.shape[1]
+        r = np.eye(k)
+        p = np.zeros((k, k))
+        
+        n_jobs = _resolve_n_jobs(n_jobs)
+        rows = range(k - 1)
+        if n_jobs == 1:
+            results = (_kendall_row(ranks, perms, ties, i) for i in rows)
+            self._fill_kendall_rows(r, p, results)
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_kendall_worker,
+                                     initargs=(ranks, perms, ties)) as pool:
+                self._fill_kendall_rows(r, p, pool.map(_kendall_row_worker, rows))
+        
+        return self._to_frames(r, p)
+    
+    @staticmethod
+    def _fill_kendall_rows(r, p, results):
+        for i, taus, pvals in results:
+            r[i, i+1:] = r[i+1:, i] = taus
+            p[i, i+1:] = p[i+1:, i] = pvals
+    
+    def _to_frames(self, r, p):
         cols = self.df.columns
-        n = len(cols)
-        
-        corr_matrix = pd.DataFrame(np.zeros((n, n)), columns=cols, index=cols)
-        pval_matrix = pd.DataFrame(np.zeros((n, n)), columns=cols, index=cols)
-        
-        for i in range(n):
-            for j in range(n):
-                if i == j:
-                    corr_matrix.iloc[i, j] = 1.0
-                    pval_matrix.iloc[i, j] = 0.0
-                    
-                else:
-                    x = self.df.iloc[:, i]
-                    y = self.df.iloc[:, j]
-                    
-                    if method == "pearson":
-                        r, p = stats.pearsonr(x, y)
-                    elif method == "spearman":
-                        r, p = stats.spearmanr(x, y)
-                    elif method == "kendall":
-                        r, p = stats.kendalltau(x, y)
-                    else:
-                        raise ValueError("Invalid method. Choose 'pearson', 'spearman', or 'kendall'.")
-                        
-                    corr_matrix.iloc[i, j] = r
-                    pval_matrix.iloc[i, j] = p
-            
-            return corr_matrix, pval_matrix
+        corr_matrix = pd.DataFrame(r, columns=cols, index=cols)
+        pval_matrix = pd.DataFrame(p, columns=cols, index=cols)
+        return corr_matrix, pval_matrix
         
-    def corr(self, method="pearson", return_pvalues=False):
+    # ------ Rolling Correlation -----
+    def rolling_corr(self, window, min_periods=None, chunk_rows=1024):
+        """
+        Rolling Pearson correlation matrix over the DataFrame rows.
+        
+        - window: int for a fixed number of rows, or an offset such as "30min"
+          / pd.Timedelta for a time-based window over a DatetimeIndex
+          (covering (t - window, t], as in pandas).
+        - min_periods: minimum rows in a window for a result (defaults to
+          window for counts and 1 for time-based windows).
+        - chunk_rows: output rows per block; temporaries are O(chunk_rows * k^2).
+        
+        Windowed co-moments come from differences of running totals, which
+        are restarted and recentered for every block of chunk_rows rows, so
+        accuracy does not degrade with the length of the series.
+        Returns a DataFrame indexed by (row label, column), like
+        DataFrame.rolling(...).corr().
+        """
+        if self.df is None:
+            raise ValueError("df must be provided for rolling correlation")
+        X = self.df.to_numpy(dtype=float)
+        if np.isnan(X).any():
+            raise ValueError("Rolling correlation does not support NaN values")
+        T, k = X.shape
+        
+        # Window [start, end) for each row
+        end = np.arange(1, T + 1)
+        if isinstance(window, (int, np.integer)):
+            if window < 1:
+                raise ValueError("window must be a positive integer")
+            start = np.maximum(end - window, 0)
+            min_periods = window if min_periods is None else min_periods
+        else:
+            if not isinstance(self.df.index, pd.DatetimeIndex):
+                raise ValueError("Time-based windows require a DatetimeIndex")
+            if not self.df.index.is_monotonic_increasing:
+                raise ValueError("The DatetimeIndex must be sorted in increasing order")
+            times = self.df.index.to_numpy()
+            start = np.searchsorted(times, times - pd.Timedelta(window), side="right")
+            min_periods = 1 if min_periods is None else min_periods
+        
+        r = np.empty((T, k, k))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for a in range(0, T, chunk_rows):
+                b = min(a + chunk_rows, T)
+                comoment = _window_comoments(X, start[a:b], end[a:b], chunk_rows)
+                var = np.diagonal(comoment, axis1=1, axis2=2)
+                r[a:b] = comoment / np.sqrt(var[:, :, np.newaxis] * var[:, np.newaxis, :])
+        np.clip(r, -1.0, 1.0, out=r)
+        r[(end - start) < max(min_periods, 1)] = np.nan
+        
+        cols = self.df.columns
+        index = pd.MultiIndex.from_product([self.df.index, cols])
+        return pd.DataFrame(r.reshape(T * k, k), index=index, columns=cols)
+    
+    def corr(self, method="pearson", return_pvalues=False, n_jobs=1, nan_policy="propagate"):
         """
         Compute correlation.
         - For pairwise (x,y), returns dict with r and p.
         - For DataFrame, returns correlation matrix (and p-values if requested).
+        - n_jobs sets the worker processes for the Kendall matrix (-1 = all CPUs).
+        - nan_policy="pairwise" ignores NaNs pair by pair (DataFrame Pearson only).
         """
         
         method = method.lower()
@@ -101,11 +482,83 @@ class Correlation:
             
         # DataFrame case
         else:
-            corr_matrix, pval_matrix = self._df_corr_with_pvalues(method)
+            corr_matrix, pval_matrix = self._df_corr_with_pvalues(method, n_jobs, nan_policy)
             if return_pvalues:
                 return{"correlation": corr_matrix, "p_values": pval_matrix}
             return corr_matrix
             
+class CorrelationAccumulator:
+    """
+    Streaming Pearson correlation for data that does not fit in memory.
+    
+    Keeps the running count, column means and co-moment matrix
+    (Welford/Chan updates), so chunks can be fed one at a time with
+    update() and partial results from different workers combined with
+    merge(). result() matches Correlation(df=...).corr("pearson").
+    """
+    def __init__(self, columns=None):
+        self.columns = columns
+        self.n = 0
+        self.mean = None
+        self.comoment = None # sum of (x - mean)(x - mean)^T
+        
+    def update(self, chunk):
+        """Add a chunk of rows (DataFrame or 2-D array)."""
+        if isinstance(chunk, pd.DataFrame):
+            if self.columns is None:
+                self.columns = chunk.columns
+            elif not chunk.columns.equals(pd.Index(self.columns)):
+                raise ValueError("Chunk columns do not match the accumulator columns")
+            X = chunk.to_numpy(dtype=float)
+        else:
+            X = np.atleast_2d(np.asarray(chunk, dtype=float))
+        
+        if X.shape[0] == 0:
+            return self
+        mean = X.mean(axis=0)
+        Xc = X - mean
+        self._combine(X.shape[0], mean, Xc.T @ Xc)
+        return self
+    
+    def merge(self, other):
+        """Fold in the partial result of another accumulator."""
+        if self.columns is None:
+            self.columns = other.columns
+        if other.n:
+            self._combine(other.n, other.mean, other.comoment)
+        return self
+    
+    def _combine(self, n_b, mean_b, comoment_b):
+        if self.n == 0:
+            self.n, self.mean, self.comoment = n_b, mean_b.copy(), comoment_b.copy()
+            return
+        if mean_b.shape != self.mean.shape:
+            raise ValueError("Chunks must have the same number of columns")
+        
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.comoment = self.comoment + comoment_b + np.outer(delta, delta) * (self.n * n_b / n)
+        self.mean = self.mean + delta * (n_b / n)
+        self.n = n
+        
+    def result(self, return_pvalues=False):
+        """Pearson correlation matrix (and p-values if requested)."""
+        if self.n == 0:
+            raise ValueError("No data has been accumulated")
+        
+        with np.errstate(divide="ignore", invalid="ignore"):
+            scale = np.sqrt(np.diag(self.comoment))
+            r = self.comoment / np.outer(scale, scale)
+        np.clip(r, -1.0, 1.0, out=r)
+        np.fill_diagonal(r, 1.0)
+        
+        cols = self.columns if self.columns is not None else range(r.shape[0])
+        corr_matrix = pd.DataFrame(r, columns=cols, index=cols)
+        if return_pvalues:
+            pval_matrix = pd.DataFrame(_pvalues_from_r(r, self.n), columns=cols, index=cols)
+            return {"correlation": corr_matrix, "p_values": pval_matrix}
+        return corr_matrix
+    
 # ----------------------- Example Usage -----------------------
 if __name__ == "__main__":
     # Pairwise example
@@ -114,6 +567,8 @@ if __name__ == "__main__":
     corr_pair = Correlation(x, y)
     print(corr_pair.pearson())
     print(corr_pair.spearman())
+    print(corr_pair.permutation_test(n_resamples=2000, seed=0))
+    print(corr_pair.bootstrap_ci(n_resamples=2000, seed=0))
     
     
     # DataFrame example
@@ -132,4 +587,12 @@ if __name__ == "__main__":
     results = corr_matrix.corr("spearman", return_pvalues=True)
     print("Correlation:\n", results["correlation"])
     print("P-values:\n", results["p_values"])
-                                        
\ No newline at end of file
+    
+    # Streaming example: feed chunks (e.g. from pd.read_csv(..., chunksize=...))
+    acc = CorrelationAccumulator()
+    for start in range(0, len(df), 2):
+        acc.update(df.iloc[start:start + 2])
+    print("Streaming Pearson:\n", acc.result())
+    
+    # Rolling correlation over the last 3 rows
+    print("Rolling Pearson:\n", corr_matrix.rolling_corr(3).tail(6))
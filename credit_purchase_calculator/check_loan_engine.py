@@ -0,0 +1,114 @@
+"""
+Regression check for the vectorized loan column engine.
+
+Builds a random sheet (including NaN APR/term rows and fractional terms),
+computes the derived columns with the original row-wise df.apply lambdas
+and with add_loan_columns. With exact=True DataFrame.equals must hold; the
+default (np.power) path must keep every growth factor within 1 ulp of the
+scalar formula. The incremental mode (rows=) is checked against a full
+recompute as well, and the amortization schedules must skip loans with
+missing inputs without raising any NumPy warning.
+
+Run from this folder:
+    python check_loan_engine.py
+"""
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from utils import add_loan_columns, growth_factors
+from utils.amortization import iter_schedule_chunks
+
+LENGTH_OF_MONTH = 28
+DERIVED_COLUMNS = ['Total Cost', 'Total Int.', 'Total_Financed_Cost', 'Monthly_Payment']
+
+# Original per-row formulas from main.py, kept verbatim as the reference
+def cost_after_taxes_method(cost, qty, sales_tax):
+    tot_cost = cost * qty * (1 + sales_tax)
+    return tot_cost
+
+def term_interest_method(principal, apr, num_days_financed):
+    daily_rate = apr / 365
+    final_amt = principal * (1 + daily_rate) ** num_days_financed
+    return final_amt - principal
+
+def make_sheet(n_rows, seed=0):
+    """Random input sheet with the columns main.py reads."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'Item': [f"item_{i}" for i in range(n_rows)],
+        'Cost': np.round(rng.uniform(1, 3000, n_rows), 2),
+        'Qty': rng.integers(1, 5, n_rows),
+        'Sales_Tax': rng.choice([0.0, 0.0725, 0.08, 0.0925], n_rows),
+        'APR_%': np.where(rng.random(n_rows) < 0.5,
+                          rng.choice([0.0, 0.1999, 0.2499, 0.299], n_rows),
+                          np.round(rng.uniform(0, 0.35, n_rows), 6)),
+        'Term_Period_Days': rng.integers(1, 1826, n_rows).astype(float),
+    })
+    df.loc[df.index[::37], 'APR_%'] = np.nan
+    df.loc[df.index[::41], 'Term_Period_Days'] = np.nan
+    df.loc[df.index[::29], 'Term_Period_Days'] += rng.uniform(0, 1, len(df.index[::29]))
+    return df
+
+def reference_columns(df):
+    """Derived columns exactly as main.py computed them with df.apply."""
+    df = df.copy()
+    df['Total Cost'] = df.apply(
+        lambda row: cost_after_taxes_method(row['Cost'], row['Qty'], row['Sales_Tax']), axis=1)
+    df['Total Int.'] = df.apply(
+        lambda row: term_interest_method(row['Total Cost'], row['APR_%'], row['Term_Period_Days']), axis=1)
+    df['Total_Financed_Cost'] = df['Total Cost'] + df['Total Int.']
+    df['Num_Payments'] = np.ceil(df['Term_Period_Days'] / LENGTH_OF_MONTH)
+    df['Monthly_Payment'] = df['Total_Financed_Cost'] / df['Num_Payments']
+    df.drop('Num_Payments', axis=1, inplace=True)
+    return df
+
+if __name__ == "__main__":
+    sheet = make_sheet(20000)
+    expected = reference_columns(sheet)
+    failed = False
+
+    ok = add_loan_columns(sheet.copy(), LENGTH_OF_MONTH, exact=True).equals(expected)
+    failed |= not ok
+    print(f"add_loan_columns(exact=True)      {'OK' if ok else 'FAIL'}")
+
+    apr = sheet['APR_%'].to_numpy()
+    days = sheet['Term_Period_Days'].to_numpy()
+    scalar = np.array([(1 + a / 365) ** d for a, d in zip(apr, days)])
+    try:
+        np.testing.assert_array_max_ulp(growth_factors(apr, days), scalar, maxulp=1)
+        ok = True
+    except AssertionError:
+        ok = False
+    full = add_loan_columns(sheet.copy(), LENGTH_OF_MONTH)
+    ok &= np.allclose(full[DERIVED_COLUMNS], expected[DERIVED_COLUMNS], rtol=1e-12, atol=0, equal_nan=True)
+    failed |= not ok
+    print(f"growth factors within 1 ulp       {'OK' if ok else 'FAIL'}")
+
+    # Recompute a subset of rows on top of stale derived columns
+    rows = np.zeros(len(sheet), dtype=bool)
+    rows[::3] = True
+    partial = full.copy()
+    partial.loc[rows, DERIVED_COLUMNS] = 0.0
+    partial = add_loan_columns(partial, LENGTH_OF_MONTH, rows=rows)
+    ok = partial.equals(full)
+    failed |= not ok
+    print(f"add_loan_columns(rows=) vs full   {'OK' if ok else 'FAIL'}")
+
+    # Schedules: one row per period for valid loans, none for loans with
+    # missing inputs, and no cast/invalid-value warnings along the way
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        schedule = pd.concat(iter_schedule_chunks(full, batch_size=4096))
+    inputs = full[['Total Cost', 'APR_%', 'Term_Period_Days']].to_numpy(dtype=float)
+    valid = np.isfinite(inputs).all(axis=1) & (full['Term_Period_Days'] > 0).to_numpy()
+    expected_periods = np.where(valid, np.ceil(full['Term_Period_Days'].fillna(0) / LENGTH_OF_MONTH), 0)
+    periods = schedule['Loan'].value_counts().reindex(full.index, fill_value=0).to_numpy()
+    ok = (np.array_equal(periods, expected_periods)
+          and np.isfinite(schedule[['Payment', 'Interest', 'Principal', 'Balance']].to_numpy()).all())
+    failed |= not ok
+    print(f"amortization schedules            {'OK' if ok else 'FAIL'}")
+
+    sys.exit(1 if failed else 0)
@@ -6,7 +6,8 @@ import sys
 from datetime import datetime
 import shutil
 import pandas as pd
-import numpy as np
+from utils import (add_loan_columns, future_value_daily_compound, write_schedules, read_sheet, write_sheet,
+                   row_hashes, load_row_hashes, save_row_hashes, remove_row_hashes, changed_rows)
 
 def parse_args():
 
@@ -17,12 +18,30 @@ def parse_args():
                         required=True,
                         help="Absolute path of input sheet."
                     )
+    parser.add_argument('--schedule-out',
+                        type=str,
+                        default=None,
+                        help="Optional .csv or .parquet path for per-period amortization schedules."
+                    )
+    parser.add_argument('--output',
+                        type=str,
+                        default=None,
+                        help="Optional output path (.xlsx, .csv, .parquet or .feather). Defaults to the input sheet."
+                    )
+    parser.add_argument('--incremental',
+                        action='store_true',
+                        help="Only recompute rows whose inputs changed since the last run (updates the sheet in place)."
+                    )
 
     args = parser.parse_args() # parse arguments
     sheetpath = args.sheetpath
 
     # Convert path into absolute path
     abs_path = os.path.abspath(sheetpath)
+    args.sheetpath = abs_path
+
+    if args.incremental and args.output:
+        parser.error("--incremental updates the sheet in place and cannot be combined with --output")
 
     # Check if file exists
 
@@ -30,7 +49,7 @@ def parse_args():
         print(f"Error: File does not exist at: {abs_path}")
         sys.exit(1)
 
-    return abs_path
+    return args
 
 def cost_after_taxes_method(cost, qty, sales_tax):
     """Calculates the total cost after quantity and sales tax"""
@@ -39,8 +58,7 @@ def cost_after_taxes_method(cost, qty, sales_tax):
 
 def term_interest_method(principal, apr, num_days_financed):
     """Calculate the total term interest of a loan (compound interest daily)"""
-    daily_rate = apr / 365
-    final_amt = principal * (1 + daily_rate) ** num_days_financed
+    final_amt = future_value_daily_compound(principal, apr, num_days_financed)
     return final_amt - principal    
 
 def append_timestamp_to_filename(filename):
@@ -57,13 +75,15 @@ def append_timestamp_to_filename(filename):
 
 if __name__ == "__main__":
     LENGTH_OF_MONTH = 28
-    filepath = parse_args()
+    args = parse_args()
+    filepath = args.sheetpath
+    output_path = os.path.abspath(args.output) if args.output else filepath
     #print(f"File path received: {filepath}")
 
-    # read excel file
-    ORIGINAL_DATA = pd.read_excel(filepath) # Default: reads first sheet
+    # read sheet (Excel: first sheet; CSV, Parquet and Feather also supported)
+    ORIGINAL_DATA = read_sheet(filepath)
     df = ORIGINAL_DATA.copy()  # Variable used to compare with output of this code.
-                        # Determines if output needs to be written to a new excel file.
+                        # Determines if output needs to be written to a new file.
 
     pd.set_option('display.precision', 4) # global pandas precision
 
@@ -71,51 +91,51 @@ if __name__ == "__main__":
     print(df.shape)
 
     ## Calculation Methods
-    # Calculate Total Cost
-    df['Total Cost'] = df.apply(
-        lambda row: cost_after_taxes_method(
-            row['Cost'],
-            row['Qty'],
-            row['Sales_Tax']
-        ),
-            axis=1
-    )
-
-    # Calculate Term Interest
-    df['Total Int.'] = df.apply(
-        lambda row: term_interest_method(
-            row['Total Cost'],
-            row['APR_%'],
-            row['Term_Period_Days']
-        ),
-            axis=1
-    )
-
-    # Calculate Total Financed Cost
-    df['Total_Financed_Cost'] = df['Total Cost'] + df['Total Int.']
-    # Calculate Monthly Payment (28-day Interval)
-    df['Num_Payments'] = np.ceil( df['Term_Period_Days'] / LENGTH_OF_MONTH )
-    df['Monthly_Payment'] = df['Total_Financed_Cost'] / df['Num_Payments']
-    df.drop('Num_Payments', axis=1, inplace=True) # remove column so NOT shown in output
+    # Total Cost, Term Interest, Total Financed Cost and Monthly Payment
+    # (28-day interval), computed as whole-column operations
+    if args.incremental:
+        # Only rows whose inputs changed since the last run
+        hashes = row_hashes(df)
+        changed = changed_rows(df, hashes, load_row_hashes(filepath))
+        print(f"Recomputing {changed.sum()} of {len(df)} rows")
+        if changed.any():
+            df = add_loan_columns(df, LENGTH_OF_MONTH, rows=changed)
+    else:
+        df = add_loan_columns(df, LENGTH_OF_MONTH)
+
+    # Stream per-period amortization schedules (not part of the sheet)
+    if args.schedule_out:
+        n_rows = write_schedules(df, args.schedule_out, length_of_month=LENGTH_OF_MONTH)
+        print(f"Wrote {n_rows} schedule rows to {args.schedule_out}")
 
     print(df.head())
     print(df.shape)
 
     # Compare if new dataframe (after applying methods) is different
-    # from the input argument dataframe (from excel file)
-    df_isdiff = not ORIGINAL_DATA.equals(df)
+    # from the input argument dataframe (from the input sheet)
+    df_isdiff = output_path != filepath or not ORIGINAL_DATA.equals(df)
 
-    # Save to Excel (If file exists, rename old file by appending date and time)
-    if os.path.exists(filepath) and df_isdiff:
-        BACKUP_FILENAME = append_timestamp_to_filename(filepath)
-        shutil.move(filepath, BACKUP_FILENAME)
+    # Save sheet (If file exists, rename old file by appending date and time)
+    if os.path.exists(output_path) and df_isdiff:
+        BACKUP_FILENAME = append_timestamp_to_filename(output_path)
+        shutil.move(output_path, BACKUP_FILENAME)
         print(f"Renamed exisiting file to: {BACKUP_FILENAME}")
 
 
-    # Save dataframe into Excel file
+    # Save dataframe into the output file
     if df_isdiff:
-        df.to_excel(filepath, index=False)
-        print(f"New file saved as {filepath}")
+        write_sheet(df, output_path)
+        print(f"New file saved as {output_path}")
     else:
         print("Output dataframe is the same as input dataframe. No new file saved.")
+
+    # Remember the input hashes for the next incremental run. A full run
+    # that writes elsewhere leaves this sheet's derived values as they were,
+    # so its index can no longer be trusted.
+    if args.incremental:
+        save_row_hashes(filepath, hashes)
+    elif output_path == filepath:
+        save_row_hashes(filepath, row_hashes(df))
+    else:
+        remove_row_hashes(filepath)
         
\ No newline at end of file
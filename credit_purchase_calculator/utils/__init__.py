@@ -1,3 +1,6 @@
 #utils/__init__.py
 
-from .finance_calc_module import future_value_daily_compound
+from .finance_calc_module import future_value_daily_compound, future_value_daily_compound_array, growth_factors
+from .loan_engine import add_loan_columns
+from .amortization import amortization_arrays, write_schedules
+from .sheet_io import read_sheet, write_sheet, row_hashes, load_row_hashes, save_row_hashes, remove_row_hashes, changed_rows
@@ -0,0 +1,127 @@
+"""Per-period amortization schedules, built per batch of loans and streamed to disk."""
+import os
+
+import numpy as np
+import pandas as pd
+
+from .loan_engine import LENGTH_OF_MONTH
+
+SCHEDULE_COLUMNS = ['Loan', 'Period', 'Payment', 'Interest', 'Principal', 'Balance']
+
+def amortization_arrays(principal, apr, term_days, length_of_month=LENGTH_OF_MONTH):
+    """
+    Amortization schedules for a batch of loans as 2-D arrays (loans x periods).
+
+    Each loan is repaid in ceil(term_days / length_of_month) equal payments.
+    Interest compounds daily, so the rate per period is
+    (1 + apr/365) ** length_of_month - 1. This is a standard amortizing
+    payment, so it differs from the sheet's Monthly_Payment, which spreads
+    the full-term interest evenly over the payments.
+
+    Returns a dict with 'payment', 'interest', 'principal' and 'balance'
+    arrays (entries past a loan's last period are NaN) and 'n_periods'.
+    Loans with a missing or non-positive principal or term, or a missing
+    or negative APR, get zero periods (all-NaN rows).
+    """
+    principal = np.asarray(principal, dtype=float)
+    apr = np.asarray(apr, dtype=float)
+    term_days = np.asarray(term_days, dtype=float)
+
+    valid = (np.isfinite(principal) & np.isfinite(apr) & np.isfinite(term_days)
+             & (principal > 0) & (apr >= 0) & (term_days > 0))
+    n_periods = np.zeros(principal.shape, dtype=int)
+    n_periods[valid] = np.ceil(term_days[valid] / length_of_month).astype(int)
+
+    # Invalid loans are evaluated as zero so they never produce NaN/inf warnings
+    rate = np.where(valid, (1 + np.where(valid, apr, 0) / 365) ** length_of_month - 1, 0)[:, np.newaxis]
+    P = np.where(valid, principal, 0)[:, np.newaxis]
+    n = np.maximum(n_periods, 1)[:, np.newaxis]
+    k = np.arange(n_periods.max(initial=0) + 1)[np.newaxis, :] # period 0 = loan start
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = (1 + rate) ** k
+        payment = np.where(rate > 0, P * rate / (1 - (1 + rate) ** -n), P / n)
+        # Closed-form remaining balance after k payments
+        balance = np.where(rate > 0,
+                           P * growth - payment * (growth - 1) / rate,
+                           P - payment * k)
+
+    interest = balance[:, :-1] * rate
+    principal_paid = payment - interest
+    balance = balance[:, 1:]
+    payment = np.broadcast_to(payment, balance.shape).copy()
+
+    # Final period clears the loan exactly, then blank out unused periods
+    periods = k[:, 1:]
+    last = periods == n_periods[:, np.newaxis]
+    principal_paid[last] = (balance + principal_paid)[last]
+    payment[last] = (principal_paid + interest)[last]
+    balance[last] = 0.0
+    unused = periods > n_periods[:, np.newaxis]
+    for arr in (payment, interest, principal_paid, balance):
+        arr[unused] = np.nan
+
+    return {'payment': payment, 'interest': interest, 'principal': principal_paid,
+            'balance': balance, 'n_periods': n_periods}
+
+def iter_schedule_chunks(df, batch_size=10000, principal_col='Total Cost',
+                         length_of_month=LENGTH_OF_MONTH):
+    """
+    Yield long-format schedule DataFrames (SCHEDULE_COLUMNS), one per batch
+    of `batch_size` loans, so the full portfolio is never held in memory.
+    The Loan column holds the row label of the loan in `df`.
+    """
+    for start in range(0, len(df), batch_size):
+        batch = df.iloc[start:start + batch_size]
+        sched = amortization_arrays(batch[principal_col], batch['APR_%'],
+                                    batch['Term_Period_Days'], length_of_month)
+
+        n_periods = sched['n_periods']
+        valid = np.arange(sched['balance'].shape[1])[np.newaxis, :] < n_periods[:, np.newaxis]
+        yield pd.DataFrame({
+            'Loan': np.repeat(batch.index.to_numpy(), n_periods),
+            'Period': np.nonzero(valid)[1] + 1,
+            'Payment': sched['payment'][valid],
+            'Interest': sched['interest'][valid],
+            'Principal': sched['principal'][valid],
+            'Balance': sched['balance'][valid],
+        }, columns=SCHEDULE_COLUMNS)
+
+def write_schedules(df, path, batch_size=10000, principal_col='Total Cost',
+                    length_of_month=LENGTH_OF_MONTH):
+    """
+    Stream amortization schedules for every loan in `df` to a CSV or
+    Parquet file (by extension), one batch at a time. Parquet output needs
+    pyarrow. Returns the number of schedule rows written.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    chunks = iter_schedule_chunks(df, batch_size, principal_col, length_of_month)
+    n_rows = 0
+
+    if ext == '.csv':
+        with open(path, 'w', newline='') as f:
+            for i, chunk in enumerate(chunks):
+                chunk.to_csv(f, index=False, header=(i == 0))
+                n_rows += len(chunk)
+    elif ext == '.parquet':
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("Writing Parquet schedules requires pyarrow") from exc
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+                n_rows += len(chunk)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        raise ValueError(f"Unsupported schedule format: {ext} (use .csv or .parquet)")
+
+    return n_rows
@@ -1,5 +1,130 @@
+import math
+from collections import OrderedDict
+
+import numpy as np
+
 def future_value_daily_compound(principal, annual_rate, days):
     
     daily_rate = annual_rate / 365
 
     return principal * (1 + daily_rate) ** days
+
+def future_value_daily_compound_array(principal, annual_rate, days, exact=False):
+    """
+    Array version of future_value_daily_compound (growth factors from
+    growth_factors(); see there for `exact`).
+    """
+    return np.asarray(principal, dtype=float) * growth_factors(annual_rate, days, exact)
+
+def growth_factors(annual_rate, days, exact=False):
+    """
+    (1 + annual_rate/365) ** days for broadcastable arrays of rates and days.
+
+    Rates with many whole-day terms are looked up in a cached per-rate table
+    (see _GrowthTableCache), built with the scalar pow of the scalar
+    function. The rest uses np.power, whose SIMD pow can differ from the
+    scalar pow by 1 ulp. With exact=True the rest is instead evaluated with
+    the scalar pow once per distinct (rate, days) pair, so results are
+    bit-identical to future_value_daily_compound (at Python speed per pair).
+    """
+    shape = np.broadcast_shapes(np.shape(annual_rate), np.shape(days))
+    rate, days = np.broadcast_arrays(np.asarray(annual_rate, dtype=float),
+                                     np.asarray(days, dtype=float))
+    rate, days = rate.ravel(), days.ravel()
+    out = np.empty(rate.shape)
+
+    whole = np.isfinite(rate) & np.isfinite(days) & (days >= 0) & (days == np.floor(days))
+    done = np.zeros(rate.shape, dtype=bool)
+    if whole.any():
+        done[whole] = _GROWTH_TABLES.lookup(rate[whole], days[whole], out=out, index=np.flatnonzero(whole))
+
+    rest = ~done
+    if rest.any() and exact:
+        pairs, inverse = np.unique(np.column_stack([rate[rest], days[rest]]), axis=0, return_inverse=True)
+        factors = np.array([_scalar_growth(r, d) for r, d in pairs])
+        out[rest] = factors[inverse.ravel()]
+    elif rest.any():
+        with np.errstate(over='ignore', invalid='ignore'):
+            out[rest] = np.power(1 + rate[rest] / 365, days[rest])
+
+    return out.reshape(shape)
+
+def _scalar_growth(annual_rate, days):
+    """(1 + annual_rate/365) ** days as the scalar path computes it (inf on overflow, not an error)."""
+    try:
+        return math.pow(1 + annual_rate / 365, days)
+    except (OverflowError, ValueError):
+        with np.errstate(all='ignore'):
+            return float(np.float64(1 + annual_rate / 365) ** np.float64(days))
+
+class _GrowthTableCache:
+    """
+    LRU cache of per-rate growth factor rows, row[d] = (1 + rate/365) ** d.
+
+    A row is only built for a rate with at least as many terms as the row
+    has entries, so building it never costs more than evaluating the terms
+    directly. Rows are sized to the longest term seen and the cache is
+    bounded by the total number of entries, not the number of rows.
+    """
+
+    def __init__(self, max_entries=1 << 20):
+        self.max_entries = max_entries
+        self._rows = OrderedDict()
+        self._entries = 0
+
+    def clear(self):
+        self._rows.clear()
+        self._entries = 0
+
+    def lookup(self, rate, days, out, index):
+        """Write table values into out[index] where available; return the mask of rows served."""
+        # One sort groups the terms by rate
+        order = np.argsort(rate)
+        sorted_rate = rate[order]
+        starts = np.flatnonzero(np.r_[True, sorted_rate[1:] != sorted_rate[:-1]])
+        rates = sorted_rate[starts]
+        counts = np.diff(np.r_[starts, len(rate)])
+        sorted_days = days[order].astype(np.int64)
+        max_days = np.maximum.reduceat(sorted_days, starts)
+
+        # Rates with enough terms to pay for building a row, or a cached row long enough
+        usable = counts >= max_days + 1
+        if self._rows:
+            cached = np.array(list(self._rows))
+            for i in np.flatnonzero(~usable & np.isin(rates, cached)):
+                usable[i] = self._covers(float(rates[i]), int(max_days[i]))
+        usable &= max_days + 1 <= self.max_entries
+
+        served = np.empty(len(rate), dtype=bool)
+        served[order] = np.repeat(usable, counts)
+        for i in np.flatnonzero(usable):
+            group = slice(starts[i], starts[i] + counts[i])
+            row = self._row(float(rates[i]), int(max_days[i]))
+            out[index[order[group]]] = row[sorted_days[group]]
+        return served
+
+    def _covers(self, rate, max_days):
+        row = self._rows.get(rate)
+        return row is not None and len(row) > max_days
+
+    def _row(self, rate, max_days):
+        row = self._rows.get(rate)
+        if row is not None and len(row) > max_days:
+            self._rows.move_to_end(rate)
+            return row
+
+        if row is not None:
+            self._entries -= len(row)
+            del self._rows[rate]
+        row = np.array([_scalar_growth(rate, float(d)) for d in range(max_days + 1)], dtype=float)
+        row.flags.writeable = False
+
+        # Evict least recently used rows until the new one fits
+        while self._rows and self._entries + len(row) > self.max_entries:
+            _, old = self._rows.popitem(last=False)
+            self._entries -= len(old)
+        self._rows[rate] = row
+        self._entries += len(row)
+        return row
+
+_GROWTH_TABLES = _GrowthTableCache()
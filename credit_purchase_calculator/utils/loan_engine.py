@@ -0,0 +1,55 @@
+"""Vectorized column calculations for the credit purchase sheet."""
+import numpy as np
+
+from .finance_calc_module import future_value_daily_compound_array
+
+LENGTH_OF_MONTH = 28 # days per payment interval
+
+def add_loan_columns(df, length_of_month=LENGTH_OF_MONTH, keep_num_payments=False, rows=None, exact=False):
+    """
+    Add the derived loan columns to `df` (in place) using whole-column
+    NumPy operations instead of row-wise df.apply. If `rows` (a boolean
+    mask) is given, only those rows are recomputed and the others are
+    left untouched.
+
+    Input columns: Cost, Qty, Sales_Tax, APR_%, Term_Period_Days
+    Added columns: Total Cost, Total Int., Total_Financed_Cost,
+                   Monthly_Payment (and Num_Payments if keep_num_payments)
+
+    Each value goes through the same arithmetic as cost_after_taxes_method
+    and term_interest_method in main.py. The growth factors agree with them
+    to within 1 ulp, or exactly with exact=True (see growth_factors).
+    """
+    src = df if rows is None else df.loc[rows]
+    cost = src['Cost'].to_numpy(dtype=float)
+    qty = src['Qty'].to_numpy(dtype=float)
+    sales_tax = src['Sales_Tax'].to_numpy(dtype=float)
+    apr = src['APR_%'].to_numpy(dtype=float)
+    term_days = src['Term_Period_Days'].to_numpy(dtype=float)
+
+    # Total cost after quantity and sales tax
+    total_cost = cost * qty * (1 + sales_tax)
+
+    # Term interest, compounded daily
+    final_amt = future_value_daily_compound_array(total_cost, apr, term_days, exact)
+    total_int = final_amt - total_cost
+
+    total_financed = total_cost + total_int
+    num_payments = np.ceil(term_days / length_of_month)
+
+    columns = {'Total Cost': total_cost,
+               'Total Int.': total_int,
+               'Total_Financed_Cost': total_financed}
+    if keep_num_payments:
+        columns['Num_Payments'] = num_payments
+    columns['Monthly_Payment'] = total_financed / num_payments
+
+    for col, values in columns.items():
+        if rows is None:
+            df[col] = values
+        else:
+            if col not in df.columns:
+                df[col] = np.nan
+            df.loc[rows, col] = values
+
+    return df
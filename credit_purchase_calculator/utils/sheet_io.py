@@ -0,0 +1,81 @@
+"""Reading/writing the credit sheet in Excel or columnar formats, plus the row-hash index."""
+import os
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+INPUT_COLUMNS = ['Cost', 'Qty', 'Sales_Tax', 'APR_%', 'Term_Period_Days']
+DERIVED_COLUMNS = ['Total Cost', 'Total Int.', 'Total_Financed_Cost', 'Monthly_Payment']
+
+_READERS = {
+    '.xlsx': pd.read_excel,
+    '.xls': pd.read_excel,
+    '.csv': partial(pd.read_csv, float_precision='round_trip'), # exact floats, so reruns compare equal
+    '.parquet': pd.read_parquet,
+    '.feather': pd.read_feather,
+}
+
+def _extension(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in _READERS:
+        raise ValueError(f"Unsupported sheet format: {ext} (use {', '.join(_READERS)})")
+    return ext
+
+def read_sheet(path):
+    """Read the sheet (first sheet for Excel) based on the file extension."""
+    return _READERS[_extension(path)](path)
+
+def write_sheet(df, path):
+    """Write the sheet based on the file extension."""
+    ext = _extension(path)
+    if ext in ('.xlsx', '.xls'):
+        df.to_excel(path, index=False)
+    elif ext == '.csv':
+        df.to_csv(path, index=False)
+    elif ext == '.parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.reset_index(drop=True).to_feather(path)
+
+def row_hash_index_path(path):
+    """The row-hash index is kept next to the sheet: <sheet>.rowhash.npy"""
+    return f"{path}.rowhash.npy"
+
+def row_hashes(df):
+    """64-bit hash of each row's input columns."""
+    return pd.util.hash_pandas_object(df[INPUT_COLUMNS], index=False).to_numpy()
+
+def load_row_hashes(path):
+    """Row hashes saved by the last incremental run, or None."""
+    index_path = row_hash_index_path(path)
+    if not os.path.exists(index_path):
+        return None
+    return np.load(index_path)
+
+def save_row_hashes(path, hashes):
+    np.save(row_hash_index_path(path), hashes)
+
+def changed_rows(df, hashes, previous_hashes):
+    """
+    Boolean mask of rows that need recomputing: rows whose input hash
+    differs from the previous run at the same position, rows beyond the
+    previous index, and rows with missing derived values despite finite
+    inputs (NaN inputs legitimately give NaN derived values).
+    """
+    changed = np.ones(len(df), dtype=bool)
+    if previous_hashes is not None:
+        n = min(len(hashes), len(previous_hashes))
+        changed[:n] = hashes[:n] != previous_hashes[:n]
+
+    if any(col not in df.columns for col in DERIVED_COLUMNS):
+        return np.ones(len(df), dtype=bool)
+    finite_inputs = np.isfinite(df[INPUT_COLUMNS].to_numpy(dtype=float)).all(axis=1)
+    missing = df[DERIVED_COLUMNS].isna().to_numpy().any(axis=1)
+    return changed | (missing & finite_inputs)
+
+def remove_row_hashes(path):
+    """Drop the row-hash index so the next incremental run recomputes every row."""
+    index_path = row_hash_index_path(path)
+    if os.path.exists(index_path):
+        os.remove(index_path)
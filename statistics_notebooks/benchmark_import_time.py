@@ -0,0 +1,51 @@
+"""
+Import-time benchmark for the numeric-only import paths.
+
+Imports each module in a fresh interpreter, reports the wall time and
+fails if a heavy plotting/ML dependency was pulled in at import time or
+the import exceeds its time budget.
+
+Run from this folder:
+    python benchmark_import_time.py
+"""
+import subprocess
+import sys
+
+# Modules that must only be imported on first use
+HEAVY_MODULES = ["matplotlib", "seaborn", "sklearn", "scipy"]
+
+# Module -> import time budget in seconds
+NUMERIC_IMPORTS = {
+    "utils": 0.5,
+    "correlation_analysis": 2.0,
+}
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(elapsed, ",".join(heavy))
+"""
+
+def measure_import(module, repeat=3):
+    """Best import time over `repeat` fresh interpreters and the heavy modules loaded."""
+    best, heavy = float("inf"), []
+    for _ in range(repeat):
+        result = subprocess.run([sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True, check=True)
+        elapsed, _, loaded = result.stdout.strip().partition(" ")
+        best = min(best, float(elapsed))
+        heavy = [m for m in loaded.split(",") if m]
+    return best, heavy
+
+if __name__ == "__main__":
+    failed = False
+    for module, budget in NUMERIC_IMPORTS.items():
+        elapsed, heavy = measure_import(module)
+        ok = not heavy and elapsed <= budget
+        failed |= not ok
+        print(f"{module:<22} {elapsed*1000:8.1f} ms (budget {budget*1000:.0f} ms)"
+              f"{'  heavy: ' + ', '.join(heavy) if heavy else ''}  {'OK' if ok else 'FAIL'}")
+    sys.exit(1 if failed else 0)
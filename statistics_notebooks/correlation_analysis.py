@@ -1,11 +1,5 @@
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-from scipy.stats import pearsonr, spearmanr
-from sklearn.preprocessing import StandardScaler
-from sklearn.linear_model import LinearRegression
-from sklearn.metrics import r2_score
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -13,14 +7,24 @@ warnings.filterwarnings('ignore')
 np.random.seed(42)
 
 class CorrelationAnalyzer:
-    def __init__(self, n_samples=1000):
+    DEFAULT_X_COLS = ['X1', 'X2', 'X3']
+    DEFAULT_Y_COLS = ['Y1', 'Y2']
+    
+    def __init__(self, n_samples=1000, verbose=True, x_cols=None, y_cols=None):
         """
         Initialize the correlation analyzer
         
         Parameters:
         n_samples (int): Number of data points to generate
+        verbose (bool): Print results as they are computed. Set to False for
+                        headless runs that only need the returned results.
+        x_cols (list): Independent variable columns (default ['X1', 'X2', 'X3'])
+        y_cols (list): Dependent variable columns (default ['Y1', 'Y2'])
         """
         self.n_samples = n_samples
+        self.verbose = verbose
+        self.x_cols = list(x_cols) if x_cols is not None else list(self.DEFAULT_X_COLS)
+        self.y_cols = list(y_cols) if y_cols is not None else list(self.DEFAULT_Y_COLS)
         self.data = None
         
     def generate_sample_data(self):
@@ -48,185 +52,256 @@ class CorrelationAnalyzer:
             'Y1': y1,
             'Y2': y2
         })
+        self.x_cols = list(self.DEFAULT_X_COLS)
+        self.y_cols = list(self.DEFAULT_Y_COLS)
         
-        print(f"Generated {self.n_samples} samples with 3 independent and 2 dependent variables")
-        print(f"Data shape: {self.data.shape}")
+        if self.verbose:
+            print(f"Generated {self.n_samples} samples with 3 independent and 2 dependent variables")
+            print(f"Data shape: {self.data.shape}")
         return self.data
     
-    def load_custom_data(self, data):
+    def load_custom_data(self, data, x_cols=None, y_cols=None):
         """
         Load custom data
         
         Parameters:
-        data (DataFrame): DataFrame with columns ['X1', 'X2', 'X3', 'Y1', 'Y2']
+        data (DataFrame): DataFrame containing the x and y columns
+        x_cols (list): Independent variable columns (default: current x_cols)
+        y_cols (list): Dependent variable columns (default: current y_cols)
         """
-        required_cols = ['X1', 'X2', 'X3', 'Y1', 'Y2']
+        if x_cols is not None:
+            self.x_cols = list(x_cols)
+        if y_cols is not None:
+            self.y_cols = list(y_cols)
+        required_cols = self.x_cols + self.y_cols
         if not all(col in data.columns for col in required_cols):
             raise ValueError(f"Data must contain columns: {required_cols}")
         
         self.data = data[required_cols].copy()
         self.n_samples = len(self.data)
-        print(f"Loaded custom data with {self.n_samples} samples")
+        if self.verbose:
+            print(f"Loaded custom data with {self.n_samples} samples")
         return self.data
     
+    @staticmethod
+    def _significance(p_value):
+        return "***" if p_value < 0.001 else "**" if p_value < 0.01 else "*" if p_value < 0.05 else ""
+    
+    @staticmethod
+    def _cross_correlation(X, Y):
+        """
+        Correlation of every X column with every Y column as one matrix
+        product of the standardized data, with t-distribution p-values.
+        Returns two (n_x, n_y) arrays.
+        """
+        from scipy import stats # deferred: scipy is slow to import
+        
+        n = X.shape[0]
+        Zx = (X - X.mean(axis=0)) / X.std(axis=0)
+        Zy = (Y - Y.mean(axis=0)) / Y.std(axis=0)
+        r = np.clip(Zx.T @ Zy / n, -1.0, 1.0)
+        
+        with np.errstate(divide='ignore'):
+            t = r * np.sqrt((n - 2) / (1 - r**2))
+        p = 2 * stats.t.sf(np.abs(t), n - 2)
+        return r, p
+    
     def calculate_correlations(self):
         """Calculate various correlation measures"""
         if self.data is None:
             raise ValueError("No data available. Generate or load data first.")
+        from scipy import stats
         
         # Separate independent and dependent variables
-        X = self.data[['X1', 'X2', 'X3']]
-        Y = self.data[['Y1', 'Y2']]
-        
-        correlations = {}
-        
-        # Pearson correlations
-        print("=== PEARSON CORRELATIONS ===")
-        pearson_corr = {}
-        for y_col in Y.columns:
-            pearson_corr[y_col] = {}
-            print(f"\n{y_col} correlations:")
-            for x_col in X.columns:
-                corr, p_value = pearsonr(X[x_col], Y[y_col])
-                pearson_corr[y_col][x_col] = {'correlation': corr, 'p_value': p_value}
-                significance = "***" if p_value < 0.001 else "**" if p_value < 0.01 else "*" if p_value < 0.05 else ""
-                print(f"  {x_col}: r = {corr:.4f}, p = {p_value:.4f} {significance}")
-        
-        correlations['pearson'] = pearson_corr
-        
-        # Spearman correlations (rank-based, captures non-linear relationships)
-        print("\n=== SPEARMAN CORRELATIONS ===")
-        spearman_corr = {}
-        for y_col in Y.columns:
-            spearman_corr[y_col] = {}
-            print(f"\n{y_col} correlations:")
-            for x_col in X.columns:
-                corr, p_value = spearmanr(X[x_col], Y[y_col])
-                spearman_corr[y_col][x_col] = {'correlation': corr, 'p_value': p_value}
-                significance = "***" if p_value < 0.001 else "**" if p_value < 0.01 else "*" if p_value < 0.05 else ""
-                print(f"  {x_col}: ρ = {corr:.4f}, p = {p_value:.4f} {significance}")
-        
-        correlations['spearman'] = spearman_corr
+        X = self.data[self.x_cols].to_numpy(dtype=float)
+        Y = self.data[self.y_cols].to_numpy(dtype=float)
         
+        correlations = {'matrices': {}}
+        
+        # Pearson correlations, then Spearman (rank-based, captures non-linear relationships)
+        for method in ('pearson', 'spearman'):
+            if method == 'spearman':
+                X, Y = stats.rankdata(X, axis=0), stats.rankdata(Y, axis=0)
+            r, p = self._cross_correlation(X, Y)
+            
+            correlations[method] = {
+                y_col: {x_col: {'correlation': r[i, j], 'p_value': p[i, j]}
+                        for i, x_col in enumerate(self.x_cols)}
+                for j, y_col in enumerate(self.y_cols)
+            }
+            correlations['matrices'][method] = {
+                'correlation': pd.DataFrame(r, index=self.x_cols, columns=self.y_cols),
+                'p_value': pd.DataFrame(p, index=self.x_cols, columns=self.y_cols)
+            }
+        
+        if self.verbose:
+            self._print_correlations(correlations)
         return correlations
     
+    def _print_correlations(self, correlations):
+        for method, symbol in (('pearson', 'r'), ('spearman', 'ρ')):
+            header = f"=== {method.upper()} CORRELATIONS ==="
+            print(header if method == 'pearson' else "\n" + header)
+            for y_col, x_results in correlations[method].items():
+                print(f"\n{y_col} correlations:")
+                for x_col, result in x_results.items():
+                    corr, p_value = result['correlation'], result['p_value']
+                    print(f"  {x_col}: {symbol} = {corr:.4f}, p = {p_value:.4f} {self._significance(p_value)}")
+    
     def multiple_regression_analysis(self):
-        """Perform multiple regression analysis"""
+        """
+        Perform multiple regression analysis
+        
+        All targets are fitted together with one SVD of the standardized
+        design matrix (the least-squares solve np.linalg.lstsq uses), giving
+        coefficients, standard errors and R² per target. Rank deficiency
+        (constant or collinear predictors) gives the minimum-norm solution,
+        and coefficients the data cannot identify get a NaN standard error.
+        """
         if self.data is None:
             raise ValueError("No data available. Generate or load data first.")
         
-        X = self.data[['X1', 'X2', 'X3']]
-        Y = self.data[['Y1', 'Y2']]
+        X = self.data[self.x_cols].to_numpy(dtype=float)
+        Y = self.data[self.y_cols].to_numpy(dtype=float)
+        n, k = X.shape
+        
+        # Standardize features for better interpretation (constant columns
+        # keep a scale of 1, as in StandardScaler)
+        scale = X.std(axis=0)
+        scale[scale < 10 * np.finfo(float).eps] = 1.0
+        X_scaled = (X - X.mean(axis=0)) / scale
+        A = np.column_stack([np.ones(n), X_scaled])
+        
+        # Multi-output least squares: A = U S V^T, B = V S^-1 U^T Y over the
+        # singular values above the lstsq rank tolerance
+        U, s, Vt = np.linalg.svd(A, full_matrices=False)
+        keep = s > s.max() * max(A.shape) * np.finfo(float).eps
+        rank = int(keep.sum())
+        if n - rank <= 0:
+            raise ValueError(f"Need more samples than fitted parameters for standard errors (n={n}, rank={rank})")
+        V = Vt[keep].T
+        B = V @ ((U[:, keep].T @ Y) / s[keep, np.newaxis])
+        residuals = Y - A @ B
+        
+        sse = np.sum(residuals**2, axis=0)
+        sst = np.sum((Y - Y.mean(axis=0))**2, axis=0)
+        r2 = 1 - sse / sst
+        
+        # Var(B) = sigma² (A^T A)^+ = sigma² V S^-2 V^T; a coefficient with a
+        # component in the null space of A is not identifiable
+        sigma2 = sse / (n - rank)
+        se = np.sqrt(np.outer(np.sum((V / s[keep])**2, axis=1), sigma2))
+        identifiable = np.sum(Vt[~keep]**2, axis=0) < 1e-12
+        se[~identifiable] = np.nan
         
-        # Standardize features for better interpretation
-        scaler = StandardScaler()
-        X_scaled = pd.DataFrame(scaler.fit_transform(X), columns=X.columns)
-        
-        print("\n=== MULTIPLE REGRESSION ANALYSIS ===")
         regression_results = {}
-        
-        for y_col in Y.columns:
-            # Fit regression model
-            model = LinearRegression()
-            model.fit(X_scaled, Y[y_col])
-            
-            # Predictions and R²
-            y_pred = model.predict(X_scaled)
-            r2 = r2_score(Y[y_col], y_pred)
-            
-            # Store results
+        for j, y_col in enumerate(self.y_cols):
             regression_results[y_col] = {
-                'r2_score': r2,
-                'coefficients': dict(zip(X.columns, model.coef_)),
-                'intercept': model.intercept_
+                'r2_score': r2[j],
+                'coefficients': dict(zip(self.x_cols, B[1:, j])),
+                'intercept': B[0, j],
+                'standard_errors': dict(zip(self.x_cols, se[1:, j])),
+                'intercept_se': se[0, j]
             }
-            
-            print(f"\n{y_col} Multiple Regression:")
-            print(f"  R² Score: {r2:.4f}")
-            print(f"  Intercept: {model.intercept_:.4f}")
-            print("  Standardized Coefficients:")
-            for var, coef in zip(X.columns, model.coef_):
-                print(f"    {var}: {coef:.4f}")
         
+        if self.verbose:
+            self._print_regression(regression_results)
         return regression_results
     
-    def create_correlation_matrix(self):
-        """Create and display correlation matrix heatmap"""
+    def _print_regression(self, regression_results):
+        print("\n=== MULTIPLE REGRESSION ANALYSIS ===")
+        for y_col, result in regression_results.items():
+            print(f"\n{y_col} Multiple Regression:")
+            print(f"  R² Score: {result['r2_score']:.4f}")
+            print(f"  Intercept: {result['intercept']:.4f}")
+            print("  Standardized Coefficients:")
+            for var, coef in result['coefficients'].items():
+                print(f"    {var}: {coef:.4f} (SE {result['standard_errors'][var]:.4f})")
+    
+    def create_correlation_matrix(self, save_path=None):
+        """
+        Create the correlation matrix heatmap.
+        
+        Shows it interactively, or writes it to `save_path` without opening
+        a window when a path is given.
+        """
         if self.data is None:
             raise ValueError("No data available. Generate or load data first.")
+        import correlation_report # plotting stack is only loaded when drawing
         
         # Calculate correlation matrix for all variables
         corr_matrix = self.data.corr()
         
-        # Create heatmap
-        plt.figure(figsize=(10, 8))
-        mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
-        sns.heatmap(corr_matrix, mask=mask, annot=True, cmap='coolwarm', center=0,
-                   square=True, fmt='.3f', cbar_kws={"shrink": .8})
-        plt.title('Correlation Matrix Heatmap', fontsize=16, pad=20)
-        plt.tight_layout()
-        plt.show()
+        fig = correlation_report.new_figure((10, 8), interactive=save_path is None)
+        correlation_report.draw_correlation_heatmap(fig, corr_matrix)
+        correlation_report.finish_figure(fig, save_path)
         
         return corr_matrix
     
-    def create_scatter_plots(self):
-        """Create scatter plots showing relationships"""
+    def create_scatter_plots(self, save_path=None):
+        """
+        Create scatter plots showing relationships.
+        
+        Shows them interactively, or writes them to `save_path` when given.
+        """
         if self.data is None:
             raise ValueError("No data available. Generate or load data first.")
+        import correlation_report
         
-        # Create subplots
-        fig, axes = plt.subplots(2, 3, figsize=(15, 10))
-        fig.suptitle('Scatter Plots: Independent vs Dependent Variables', fontsize=16)
-        
-        X_vars = ['X1', 'X2', 'X3']
-        Y_vars = ['Y1', 'Y2']
-        
-        for j, y_var in enumerate(Y_vars):
-            for i, x_var in enumerate(X_vars):
-                ax = axes[j, i]
-                
-                # Scatter plot
-                ax.scatter(self.data[x_var], self.data[y_var], alpha=0.6, s=20)
-                
-                # Add trend line
-                z = np.polyfit(self.data[x_var], self.data[y_var], 1)
-                p = np.poly1d(z)
-                ax.plot(self.data[x_var].sort_values(), p(self.data[x_var].sort_values()), "r--", alpha=0.8)
-                
-                # Calculate and display correlation
-                corr, _ = pearsonr(self.data[x_var], self.data[y_var])
-                ax.set_title(f'{x_var} vs {y_var}\nr = {corr:.3f}')
-                ax.set_xlabel(x_var)
-                ax.set_ylabel(y_var)
-                ax.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
-        plt.show()
+        fig = correlation_report.new_figure((15, 10), interactive=save_path is None)
+        correlation_report.draw_scatter_plots(fig, self.data, self.x_cols, self.y_cols)
+        correlation_report.finish_figure(fig, save_path)
     
-    def summary_report(self):
-        """Generate a comprehensive summary report"""
+    def compute_results(self):
+        """
+        Headless analysis: return the structured results of summary_report()
+        without printing or plotting anything.
+        """
         if self.data is None:
             raise ValueError("No data available. Generate or load data first.")
         
+        verbose, self.verbose = self.verbose, False
+        try:
+            correlations = self.calculate_correlations()
+            regression_results = self.multiple_regression_analysis()
+        finally:
+            self.verbose = verbose
+        
+        return {
+            'correlations': correlations,
+            'regression_results': regression_results,
+            'data_summary': self.data.describe(),
+            'correlation_matrix': self.data.corr()
+        }
+    
+    def summary_report(self, show_plots=True, output_dir=None):
+        """
+        Generate a comprehensive summary report
+        
+        Parameters:
+        show_plots (bool): Display the figures interactively
+        output_dir (str): Write the figures as PNG files here instead of
+                          showing them (no display needed)
+        """
+        results = self.compute_results()
+        correlations = results['correlations']
+        
         print("="*60)
         print("COMPREHENSIVE CORRELATION ANALYSIS REPORT")
         print("="*60)
         
         # Basic statistics
         print("\n1. DESCRIPTIVE STATISTICS:")
-        print(self.data.describe().round(4))
-        
-        # Calculate correlations
-        correlations = self.calculate_correlations()
+        print(results['data_summary'].round(4))
         
-        # Multiple regression
-        regression_results = self.multiple_regression_analysis()
+        self._print_correlations(correlations)
+        self._print_regression(results['regression_results'])
         
         # Strongest correlations summary
         print("\n=== STRONGEST CORRELATIONS SUMMARY ===")
-        for y_var in ['Y1', 'Y2']:
+        for y_var in self.y_cols:
             pearson_corrs = [(x_var, abs(correlations['pearson'][y_var][x_var]['correlation'])) 
-                           for x_var in ['X1', 'X2', 'X3']]
+                           for x_var in self.x_cols]
             pearson_corrs.sort(key=lambda x: x[1], reverse=True)
             
             print(f"\n{y_var} - Ranked by absolute Pearson correlation:")
@@ -236,14 +311,21 @@ class CorrelationAnalyzer:
                 print(f"  {i}. {x_var}: r = {original_corr:.4f} (p = {p_val:.4f})")
         
         # Create visualizations
-        print("\n=== GENERATING VISUALIZATIONS ===")
-        self.create_correlation_matrix()
-        self.create_scatter_plots()
+        if output_dir is not None:
+            import correlation_report
+            paths = correlation_report.save_report_figures(self.data, self.x_cols, self.y_cols, output_dir)
+            print("\n=== SAVED VISUALIZATIONS ===")
+            for path in paths.values():
+                print(f"  {path}")
+        elif show_plots:
+            print("\n=== GENERATING VISUALIZATIONS ===")
+            self.create_correlation_matrix()
+            self.create_scatter_plots()
         
         return {
             'correlations': correlations,
-            'regression_results': regression_results,
-            'data_summary': self.data.describe()
+            'regression_results': results['regression_results'],
+            'data_summary': results['data_summary']
         }
 
 # Example usage
@@ -270,4 +352,7 @@ if __name__ == "__main__":
     #     'Y2': your_y2_data
     # })
     # analyzer.load_custom_data(custom_data)
+    #
+    # Any column sets can be analyzed:
+    # analyzer.load_custom_data(df, x_cols=predictor_names, y_cols=target_names)
     # results = analyzer.summary_report()
\ No newline at end of file
@@ -0,0 +1,86 @@
+"""
+Rendering layer for CorrelationAnalyzer.
+
+Kept separate so the analysis itself never imports matplotlib or seaborn.
+Figures written to files are built on a plain matplotlib Figure (Agg
+canvas), so no display or interactive backend is needed.
+"""
+import os
+
+import numpy as np
+
+
+def new_figure(figsize, interactive=False):
+    """Pyplot figure when it will be shown, otherwise a backend-free Figure."""
+    if interactive:
+        import matplotlib.pyplot as plt
+        return plt.figure(figsize=figsize)
+    
+    from matplotlib.figure import Figure
+    return Figure(figsize=figsize)
+
+def finish_figure(fig, save_path=None):
+    """Save the figure to `save_path`, or show it when no path is given."""
+    if save_path is not None:
+        fig.savefig(save_path)
+        return save_path
+    
+    import matplotlib.pyplot as plt
+    plt.show()
+    return None
+
+def draw_correlation_heatmap(fig, corr_matrix):
+    """Lower-triangle heatmap of a correlation matrix."""
+    import seaborn as sns
+    
+    ax = fig.add_subplot()
+    mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
+    sns.heatmap(corr_matrix, mask=mask, annot=True, cmap='coolwarm', center=0,
+               square=True, fmt='.3f', cbar_kws={"shrink": .8}, ax=ax)
+    ax.set_title('Correlation Matrix Heatmap', fontsize=16, pad=20)
+    fig.tight_layout()
+    return fig
+
+def draw_scatter_plots(fig, data, x_vars, y_vars):
+    """Grid of scatter plots (rows: y_vars, columns: x_vars) with trend lines."""
+    axes = fig.subplots(len(y_vars), len(x_vars), squeeze=False)
+    fig.suptitle('Scatter Plots: Independent vs Dependent Variables', fontsize=16)
+    
+    for j, y_var in enumerate(y_vars):
+        for i, x_var in enumerate(x_vars):
+            ax = axes[j, i]
+            x, y = data[x_var], data[y_var]
+            
+            # Scatter plot
+            ax.scatter(x, y, alpha=0.6, s=20)
+            
+            # Add trend line
+            p = np.poly1d(np.polyfit(x, y, 1))
+            x_sorted = x.sort_values()
+            ax.plot(x_sorted, p(x_sorted), "r--", alpha=0.8)
+            
+            # Display correlation
+            corr = np.corrcoef(x, y)[0, 1]
+            ax.set_title(f'{x_var} vs {y_var}\nr = {corr:.3f}')
+            ax.set_xlabel(x_var)
+            ax.set_ylabel(y_var)
+            ax.grid(True, alpha=0.3)
+    
+    fig.tight_layout()
+    return fig
+
+def save_report_figures(data, x_vars, y_vars, output_dir):
+    """Write the heatmap and scatter grid as PNG files; returns their paths."""
+    os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        'correlation_matrix': os.path.join(output_dir, 'correlation_matrix.png'),
+        'scatter_plots': os.path.join(output_dir, 'scatter_plots.png')
+    }
+    
+    heatmap = draw_correlation_heatmap(new_figure((10, 8)), data.corr())
+    finish_figure(heatmap, paths['correlation_matrix'])
+    
+    scatter = draw_scatter_plots(new_figure((15, 10)), data, x_vars, y_vars)
+    finish_figure(scatter, paths['scatter_plots'])
+    
+    return paths
@@ -1,4 +1,6 @@
 #utils/__init__.py
 
 from .stats_calc_module import check_null_hypothesis_rejected
-from .stats_calc_module import evaluate_regression
\ No newline at end of file
+from .stats_calc_module import evaluate_regression
+from .stats_calc_module import adjust_pvalues
+from .stats_calc_module import grouped_two_sample_tests
@@ -1,5 +1,7 @@
-from sklearn.metrics import mean_squared_error, r2_score
-import matplotlib.pyplot as plt
+import numpy as np
+
+# pandas, sklearn, matplotlib and scipy are imported inside the functions that use
+# them so that importing the numeric helpers stays fast.
 
 def check_null_hypothesis_rejected(p_value):
     alpha = 0.05
@@ -10,6 +12,9 @@ def check_null_hypothesis_rejected(p_value):
 
 def evaluate_regression(y_true, y_pred):  
     """Evaluate regression model and plot actual vs predicted values."""
+    from sklearn.metrics import mean_squared_error, r2_score
+    import matplotlib.pyplot as plt
+    
     mse = mean_squared_error(y_true, y_pred)
     r2 = r2_score(y_true, y_pred)
 
@@ -25,4 +30,134 @@ def evaluate_regression(y_true, y_pred):
     plt.title("Actual vs. Predicted Values")
     plt.title("Actual vs. Predicted Values")
     plt.grid(True)
-    plt.show()
\ No newline at end of file
+    plt.show()
+
+def adjust_pvalues(p_values, method="bh"):
+    """
+    Multiple-testing correction of an array of p-values.
+    
+    method: "bonferroni" or "bh" (Benjamini-Hochberg false discovery rate).
+    NaN p-values are left as NaN and do not count towards the number of tests.
+    """
+    p = np.asarray(p_values, dtype=float)
+    adjusted = np.full(p.shape, np.nan)
+    valid = ~np.isnan(p)
+    pv = p[valid]
+    m = pv.size
+    
+    if method == "bonferroni":
+        adjusted[valid] = np.minimum(pv * m, 1.0)
+    elif method == "bh":
+        order = np.argsort(pv)
+        scaled = pv[order] * m / np.arange(1, m + 1)
+        # Enforce monotonicity from the largest p-value down
+        scaled = np.minimum.accumulate(scaled[::-1])[::-1]
+        bh = np.empty(m)
+        bh[order] = np.minimum(scaled, 1.0)
+        adjusted[valid] = bh
+    else:
+        raise ValueError("Invalid method. Choose 'bonferroni' or 'bh'.")
+    return adjusted
+
+def grouped_two_sample_tests(values, groups, labels, test="welch", correction="bh", alpha=0.05):
+    """
+    Two-sample test for every group at once, returned as a results table.
+    
+    Parameters:
+    values (array): Observations
+    groups (array): Group key of each observation (e.g. metric name)
+    labels (array): Sample of each observation; exactly two distinct values,
+                    the first in sorted order is sample A
+    test (str): "welch" (Welch's t-test) or "mannwhitney" (Mann-Whitney U,
+                normal approximation with tie and continuity correction)
+    correction (str): "bh", "bonferroni" or None
+    alpha (float): Significance level for the `reject` column
+    
+    Per-group counts, means and variances (or rank sums) are computed for
+    all groups together with np.bincount instead of one test call per group.
+    """
+    import pandas as pd
+    
+    values = np.asarray(values, dtype=float)
+    group_codes, group_keys = pd.factorize(np.asarray(groups), sort=True)
+    label_keys, label_codes = np.unique(np.asarray(labels), return_inverse=True)
+    if len(label_keys) != 2:
+        raise ValueError("labels must contain exactly two distinct values")
+    n_groups = len(group_keys)
+    
+    # Sufficient statistics per (group, sample) cell
+    cell = group_codes * 2 + label_codes
+    counts = np.bincount(cell, minlength=2 * n_groups).reshape(n_groups, 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means = (np.bincount(cell, weights=values, minlength=2 * n_groups).reshape(n_groups, 2) / counts)
+    
+    if test == "welch":
+        statistic, p_values = _welch_from_cells(values, cell, counts, means)
+    elif test == "mannwhitney":
+        statistic, p_values = _mannwhitney_grouped(values, group_codes, label_codes, counts)
+    else:
+        raise ValueError("Invalid test. Choose 'welch' or 'mannwhitney'.")
+    
+    results = pd.DataFrame({
+        "n_a": counts[:, 0],
+        "n_b": counts[:, 1],
+        "mean_a": means[:, 0],
+        "mean_b": means[:, 1],
+        "statistic": statistic,
+        "p_value": p_values,
+    }, index=pd.Index(group_keys, name="group"))
+    
+    results["p_adjusted"] = p_values if correction is None else adjust_pvalues(p_values, correction)
+    results["reject"] = results["p_adjusted"] < alpha
+    return results
+
+def _welch_from_cells(values, cell, counts, means):
+    """Welch's t statistic and two-sided p-value per group."""
+    from scipy import stats
+    
+    # Two-pass variance to avoid cancellation in sum-of-squares
+    sq_dev = (values - means.ravel()[cell]) ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var = np.bincount(cell, weights=sq_dev, minlength=counts.size).reshape(counts.shape) / (counts - 1)
+        se2 = var / counts
+        t = (means[:, 0] - means[:, 1]) / np.sqrt(se2[:, 0] + se2[:, 1])
+        dof = (se2[:, 0] + se2[:, 1])**2 / (se2[:, 0]**2 / (counts[:, 0] - 1) + se2[:, 1]**2 / (counts[:, 1] - 1))
+    return t, 2 * stats.t.sf(np.abs(t), dof)
+
+def _mannwhitney_grouped(values, group_codes, label_codes, counts):
+    """Mann-Whitney U of sample A and asymptotic two-sided p-value per group."""
+    from scipy import stats
+    
+    n_groups = counts.shape[0]
+    order = np.lexsort((values, group_codes))
+    g, v, lab = group_codes[order], values[order], label_codes[order]
+    
+    # Runs of tied values within a group share their average rank
+    new_run = np.ones(len(v), dtype=bool)
+    new_run[1:] = (g[1:] != g[:-1]) | (v[1:] != v[:-1])
+    run_id = np.cumsum(new_run) - 1
+    run_start = np.flatnonzero(new_run)
+    run_len = np.diff(np.append(run_start, len(v)))
+    
+    group_start = np.searchsorted(g, np.arange(n_groups))
+    first_rank = run_start - group_start[g[run_start]] + 1
+    ranks = (first_rank + (run_len - 1) / 2)[run_id]
+    
+    n_a, n_b = counts[:, 0].astype(float), counts[:, 1].astype(float)
+    n = n_a + n_b
+    rank_sum_a = np.bincount(g, weights=ranks * (lab == 0), minlength=n_groups)
+    ties = np.bincount(g[run_start], weights=run_len**3 - run_len, minlength=n_groups)
+    
+    u_a = rank_sum_a - n_a * (n_a + 1) / 2
+    u_max = np.maximum(u_a, n_a * n_b - u_a)
+    mu = n_a * n_b / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma = np.sqrt(n_a * n_b / 12 * ((n + 1) - ties / (n * (n - 1))))
+        z = (u_max - mu - 0.5) / sigma
+    p_values = np.minimum(2 * stats.norm.sf(z), 1.0)
+    
+    # No test without both samples (NaN, as for Welch, so corrections skip it)
+    empty = np.minimum(n_a, n_b) == 0
+    u_a[empty] = np.nan
+    p_values[empty] = np.nan
+    return u_a, p_values
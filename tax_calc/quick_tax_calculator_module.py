@@ -1,30 +1,36 @@
+# Define the tax brackets and their corresponding rates
+FED_TAX_BRACKETS = [
+    (0, 11000, 0.1), #(start, end, rate)
+    (11000, 44725, 0.12),
+    (44725, 95375, 0.22),
+    (95375, 182100, 0.24),
+    (182100, 231250, 0.32),
+    (231250, 578125, 0.35),
+    (578125, float('inf'), 0.37)
+]
+
+STATE_TAX_BRACKETS = [
+    (0, 10100, 0.01), #(start, end, rate)
+    (10100, 23943, 0.02),
+    (23943, 37789, 0.04),
+    (37789, 52456, 0.06),
+    (52456, 66296, 0.08),
+    (66296, 338640, 0.093),
+    (338640, 406364, 0.103),
+    (406364, 677276, 0.113),
+    (677276, float('inf'), 0.123)
+]
+
+FED_STANDARD_DEDUCTIONS = 12500
+STATE_STANDARD_DEDUCTIONS = 5202
+
 def calculate_progressive_tax(income):
-    # Define the tax brackets and their corresponding rates
-    fed_tax_brackets = [
-        (0, 11000, 0.1), #(start, end, rate)
-        (11000, 44725, 0.12),
-        (44725, 95375, 0.22),
-        (95375, 182100, 0.24),
-        (182100, 231250, 0.32),
-        (231250, 578125, 0.35),
-        (578125, float('inf'), 0.37)
-    ]
-
-    state_tax_brackets = [
-        (0, 10100, 0.01), #(start, end, rate)
-        (10100, 23943, 0.02),
-        (23943, 37789, 0.04),
-        (37789, 52456, 0.06),
-        (52456, 66296, 0.08),
-        (66296, 338640, 0.093),
-        (338640, 406364, 0.103),
-        (406364, 677276, 0.113),
-        (677276, float('inf'), 0.123)
-    ]
+    fed_tax_brackets = FED_TAX_BRACKETS
+    state_tax_brackets = STATE_TAX_BRACKETS
 
     total_tax = 0
-    fed_standard_deductions = 12500
-    state_standard_deductions = 5202
+    fed_standard_deductions = FED_STANDARD_DEDUCTIONS
+    state_standard_deductions = STATE_STANDARD_DEDUCTIONS
 
     if income > fed_standard_deductions: #Adjust federal taxable income with standard deductions
         fed_adj_income = income - fed_standard_deductions
@@ -59,3 +65,50 @@ def tax_maths_procedure(income, tax_brackets):
             total_tax += bracket_tax
 
     return total_tax
+
+# Cumulative tax at each bracket start, summed in the same order as
+# tax_maths_procedure so the batch results match it exactly
+def cumulative_bracket_table(tax_brackets):
+    starts, rates, cum_tax = [], [], []
+    total_tax = 0
+    for start, end, rate in tax_brackets:
+        starts.append(start)
+        rates.append(rate)
+        cum_tax.append(total_tax)
+        total_tax += (end - start)*rate
+    return starts, rates, cum_tax
+
+FED_BRACKET_TABLE = cumulative_bracket_table(FED_TAX_BRACKETS)
+STATE_BRACKET_TABLE = cumulative_bracket_table(STATE_TAX_BRACKETS)
+
+# Batch version of calculate_progressive_tax for whole income arrays (e.g. payroll files)
+def calculate_progressive_tax_batch(incomes):
+    import numpy as np # imported here so the GUI build does not need numpy
+
+    incomes = np.asarray(incomes, dtype=float)
+
+    #Adjust taxable incomes with standard deductions
+    fed_adj_income = np.where(incomes > FED_STANDARD_DEDUCTIONS, incomes - FED_STANDARD_DEDUCTIONS, incomes)
+    state_adj_income = np.where(incomes > STATE_STANDARD_DEDUCTIONS, incomes - STATE_STANDARD_DEDUCTIONS, incomes)
+
+    fed_total_tax = tax_maths_procedure_batch(fed_adj_income, FED_BRACKET_TABLE)
+    state_total_tax = tax_maths_procedure_batch(state_adj_income, STATE_BRACKET_TABLE)
+    total_tax = fed_total_tax + state_total_tax
+
+    income_tax_dict = {"total": total_tax, "fed": fed_total_tax, "state": state_total_tax}
+    return income_tax_dict # returns a dictionary of arrays with broken down tax results
+
+# function called by calculate_progressive_tax_batch function
+def tax_maths_procedure_batch(incomes, bracket_table):
+    import numpy as np
+
+    starts, rates, cum_tax = (np.asarray(col, dtype=float) for col in bracket_table)
+
+    # Bracket holding each income (-1 if the income is not above the first start)
+    idx = np.searchsorted(starts, incomes, side='left') - 1
+    in_bracket = idx >= 0
+    idx = np.maximum(idx, 0)
+
+    # Tax of the full brackets below plus the part inside the current bracket
+    total_tax = cum_tax[idx] + (incomes - starts[idx])*rates[idx]
+    return np.where(in_bracket, total_tax, 0.0)